@@ -3,17 +3,27 @@
 Analyze the combined strategy's big return in 2024
 """
 
+import os
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from datetime import datetime
 
+def _load_results(name):
+    """Load a backtest results file, using the feather copy when it is up to date"""
+    feather_path, csv_path = f'{name}.feather', f'{name}.csv'
+    # A run without pyarrow rewrites only the CSV, leaving an older feather copy behind
+    if os.path.exists(feather_path) and (
+            not os.path.exists(csv_path) or os.path.getmtime(feather_path) >= os.path.getmtime(csv_path)):
+        return pd.read_feather(feather_path)
+    return pd.read_csv(csv_path)
+
 def analyze_combined_2024():
     """Analyze the combined strategy's performance in 2024"""
     
-    # Load portfolio data
-    portfolio_df = pd.read_csv('backtest_portfolio.csv')
-    trades_df = pd.read_csv('backtest_trades.csv')
+    # Load portfolio data (prefer the Arrow copies written by test_backtesting.py)
+    portfolio_df = _load_results('backtest_portfolio')
+    trades_df = _load_results('backtest_trades')
     
     # Filter for combined strategy
     combined_portfolio = portfolio_df[portfolio_df['Strategy'] == 'combined'].copy()
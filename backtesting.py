@@ -1,30 +1,74 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from multiprocessing import shared_memory
 import yfinance as yf
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Callable, Dict, List, Tuple
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple, Union
 import matplotlib.pyplot as plt
 import seaborn as sns
+from trading_algorithms import TradingAlgorithms
+
+# Indicator frames keyed by a hash of the input data, shared by all engines in the process
+_INDICATOR_CACHE: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+_INDICATOR_CACHE_SIZE = 32
+# Engines run on several threads in the Streamlit app; guards lookups against concurrent evictions
+_INDICATOR_CACHE_LOCK = threading.Lock()
+
+# Shared price blocks this process has attached to via BarsHandle.load, by name. They are
+# never closed, so frames viewing them stay valid for the life of the (worker) process.
+_ATTACHED_BLOCKS: Dict[str, shared_memory.SharedMemory] = {}
+
+# Dates may be given as 'YYYY-MM-DD' strings or as date/Timestamp objects
+DateLike = Union[str, date, pd.Timestamp]
+
+def _date_window(df: pd.DataFrame, start_date: DateLike, end_date: DateLike) -> pd.DataFrame:
+    """Rows from start_date up to, but not including, end_date - the span a download covers"""
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    tz = getattr(df.index, 'tz', None)
+    if tz is not None:
+        start = start.tz_localize(tz) if start.tzinfo is None else start.tz_convert(tz)
+        end = end.tz_localize(tz) if end.tzinfo is None else end.tz_convert(tz)
+    return df[(df.index >= start) & (df.index < end)]
 
 class BacktestingEngine:
     """
     Backtesting engine for trading algorithms on Nikkei 225 ETFs
     """
     
+    # Constructor arguments that reset() may change
+    SETTINGS = ('initial_capital', 'transaction_cost', 'slippage', 'stop_loss', 'take_profit')
+    
     def __init__(self, initial_capital: float = 1000000, 
                  transaction_cost: float = 0.002,  # 0.2% transaction cost
                  slippage: float = 0.001,  # 0.1% slippage
                  stop_loss: float = 0.05,  # 5% stop loss
                  take_profit: float = 0.15):  # 15% take profit
         self.initial_capital = initial_capital
-        self.current_capital = initial_capital
-        self.positions = {'1579.T': 0, '1360.T': 0}
-        self.trade_history = []
-        self.portfolio_values = []
         self.transaction_cost = transaction_cost
         self.slippage = slippage
         self.stop_loss = stop_loss
         self.take_profit = take_profit
+        self.reset()
+    
+    def reset(self, **settings):
+        """
+        Clear positions, cash and trade/P&L history so the engine can be reused,
+        optionally changing its settings (initial_capital, transaction_cost,
+        slippage, stop_loss, take_profit) at the same time
+        """
+        for name, value in settings.items():
+            if name not in self.SETTINGS:
+                raise TypeError(f"Unknown engine setting: {name}")
+            setattr(self, name, value)
+        
+        self.current_capital = self.initial_capital
+        self.positions = {'1579.T': 0, '1360.T': 0}
+        self.trade_history = []
+        self.portfolio_values = []
         self.position_entry_prices = {}  # Track entry prices for stop-loss/take-profit
         
         # P&L tracking
@@ -35,7 +79,7 @@ class BacktestingEngine:
         self.losing_trades = 0
         self.position_pnl = {}  # Track P&L per position
         
-    def get_historical_data(self, symbols: List[str], start_date: str, end_date: str) -> Dict[str, pd.DataFrame]:
+    def get_historical_data(self, symbols: List[str], start_date: DateLike, end_date: DateLike) -> Dict[str, pd.DataFrame]:
         """
         Fetch historical data from Yahoo Finance
         """
@@ -61,10 +105,46 @@ class BacktestingEngine:
             data[symbol] = df
         return data
     
+    def get_cached_historical_data(self, symbols: List[str], start_date: DateLike, end_date: DateLike,
+                                   cache_dir: str = '.cache') -> Dict[str, pd.DataFrame]:
+        """
+        Fetch historical data once and keep it on disk, so repeated backtests over
+        the same symbols and date range skip the download
+        """
+        key = hashlib.sha1(
+            f"{','.join(symbols)}|{pd.Timestamp(start_date):%Y-%m-%d}|{pd.Timestamp(end_date):%Y-%m-%d}".encode()
+        ).hexdigest()[:16]
+        cache_path = os.path.join(cache_dir, f"bars_{key}.pkl")
+        
+        if os.path.exists(cache_path):
+            return pd.read_pickle(cache_path)
+        
+        data = self.get_historical_data(symbols, start_date, end_date)
+        
+        # Don't cache failed or partial downloads
+        if all(not df.empty for df in data.values()):
+            os.makedirs(cache_dir, exist_ok=True)
+            pd.to_pickle(data, cache_path)
+        return data
+    
     def calculate_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Calculate common technical indicators
+        
+        Results are memoized on the frame's contents, so backtesting the same
+        price data repeatedly (e.g. several strategies) only computes them once.
         """
+        row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+        key = hashlib.blake2b(row_hashes.tobytes() + str(list(df.columns)).encode(),
+                              digest_size=16).hexdigest()
+        with _INDICATOR_CACHE_LOCK:
+            cached = _INDICATOR_CACHE.get(key)
+            if cached is not None:
+                _INDICATOR_CACHE.move_to_end(key)
+        if cached is not None:
+            # Copy so callers adding columns don't modify the cached frame
+            return cached.copy()
+        
         # Moving averages
         df['SMA_20'] = df['Close'].rolling(window=20).mean()
         df['SMA_50'] = df['Close'].rolling(window=50).mean()
@@ -96,7 +176,12 @@ class BacktestingEngine:
         # Handle NaN values
         df = df.ffill().bfill()
         
-        return df
+        with _INDICATOR_CACHE_LOCK:
+            _INDICATOR_CACHE[key] = df
+            if len(_INDICATOR_CACHE) > _INDICATOR_CACHE_SIZE:
+                _INDICATOR_CACHE.popitem(last=False)
+        
+        return df.copy()
     
     def execute_trade(self, symbol: str, action: str, quantity: int, price: float, date: datetime):
         """
@@ -241,28 +326,42 @@ class BacktestingEngine:
     def run_backtest(self, 
                     trading_algorithm: Callable,
                     symbols: List[str],
-                    start_date: str,
-                    end_date: str,
+                    start_date: DateLike,
+                    end_date: DateLike,
+                    historical_data: Optional[Dict[str, pd.DataFrame]] = None,
                     **algorithm_params) -> Dict:
         """
         Run backtesting with given trading algorithm
+        
+        historical_data: pre-fetched price data (as returned by get_historical_data)
+        to use instead of downloading it again; it is cut to start_date/end_date
         """
         # Get historical data
-        data = self.get_historical_data(symbols, start_date, end_date)
+        if historical_data is None:
+            data = self.get_historical_data(symbols, start_date, end_date)
+        else:
+            # Cut to the requested window, so passing a wider data set can't change the
+            # backtest, and copy so indicator columns don't leak back into the caller's frames
+            data = {symbol: _date_window(historical_data[symbol], start_date, end_date).copy()
+                    for symbol in symbols}
         
-        # Calculate technical indicators for each symbol
+        # Calculate technical indicators for each symbol - once over the full history.
+        # Apart from the back-filled warm-up rows, each bar's indicators depend only
+        # on earlier bars, so the per-tick .loc[:date] slices below see the values an
+        # incremental update would produce without recomputing anything in the loop.
         for symbol in symbols:
             data[symbol] = self.calculate_technical_indicators(data[symbol])
         
+        # Lay the frames out as contiguous float64 matrices once, for the per-tick reads
+        data = TradingAlgorithms.prepare(data)
+        
         # Align data by date
         common_dates = set.intersection(*[set(df.index) for df in data.values()])
         common_dates = sorted(list(common_dates))
         
-        # Initialize tracking
-        self.current_capital = self.initial_capital
+        # Initialize tracking (including P&L left over from a previous run)
+        self.reset()
         self.positions = {symbol: 0 for symbol in symbols}
-        self.trade_history = []
-        self.portfolio_values = []
         
         # Run backtest
         for date in common_dates:
@@ -396,6 +495,91 @@ class BacktestingEngine:
         plt.tight_layout()
         plt.show()
 
+class BarsHandle:
+    """
+    Price data copied once into shared memory, so worker processes can attach
+    to it by name instead of each unpickling its own copy of every frame
+    
+    Use as a context manager in the parent process and pass `handle.meta` (a
+    small picklable dict) to the workers, which read the frames in place with
+    BarsHandle.load(meta). The shared blocks are released on exit.
+    """
+    
+    def __init__(self, data: Optional[Dict[str, pd.DataFrame]]):
+        self._blocks = []
+        self.meta = None if data is None else {}
+        
+        try:
+            for symbol, df in (data or {}).items():
+                self._share(symbol, df)
+        except BaseException:
+            # Don't leave the blocks of the symbols already shared behind in /dev/shm
+            self.close()
+            raise
+    
+    def _share(self, symbol: str, df: pd.DataFrame):
+        """Copy one symbol's frame into a new shared block and record its layout"""
+        arrays = [(None, np.ascontiguousarray(df.index.values))]
+        arrays += [(col, np.ascontiguousarray(df[col].to_numpy())) for col in df.columns]
+        if any(arr.dtype.hasobject for _, arr in arrays):
+            raise TypeError(f"{symbol}: only numeric columns can be shared")
+        
+        shm = shared_memory.SharedMemory(create=True, size=max(sum(arr.nbytes for _, arr in arrays), 1))
+        self._blocks.append(shm)
+        
+        # Columns are laid out back to back as (name, dtype, offset)
+        layout, offset = [], 0
+        for name, arr in arrays:
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf, offset=offset)[:] = arr
+            layout.append((name, arr.dtype.str, offset))
+            offset += arr.nbytes
+        
+        tz = df.index.tz if isinstance(df.index, pd.DatetimeIndex) else None
+        self.meta[symbol] = {'name': shm.name, 'rows': len(df), 'layout': layout,
+                             'index_name': df.index.name, 'tz': str(tz) if tz else None}
+    
+    @staticmethod
+    def load(meta: Optional[Dict[str, dict]]) -> Optional[Dict[str, pd.DataFrame]]:
+        """
+        Price frames whose columns are views of the shared blocks (call in the worker)
+        
+        Nothing is copied here - run_backtest makes the worker's only copy. The blocks
+        stay attached until the worker process exits, so the views can't outlive them.
+        """
+        if meta is None:
+            return None
+        
+        data = {}
+        for symbol, info in meta.items():
+            shm = _ATTACHED_BLOCKS.get(info['name'])
+            if shm is None:
+                shm = _ATTACHED_BLOCKS[info['name']] = shared_memory.SharedMemory(name=info['name'])
+            
+            (_, index_dtype, index_offset), *columns = info['layout']
+            index = pd.Index(np.ndarray((info['rows'],), dtype=index_dtype, buffer=shm.buf,
+                                        offset=index_offset), name=info['index_name'])
+            if info['tz']:
+                index = index.tz_localize('UTC').tz_convert(info['tz'])
+            data[symbol] = pd.DataFrame(
+                {name: np.ndarray((info['rows'],), dtype=dtype, buffer=shm.buf, offset=offset)
+                 for name, dtype, offset in columns},
+                index=index, copy=False
+            )
+        return data
+    
+    def close(self):
+        """Release the shared memory blocks"""
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
 # Example usage
 if __name__ == "__main__":
     # This will be implemented in the next step with actual trading algorithms
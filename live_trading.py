@@ -8,7 +8,7 @@ from dotenv import load_dotenv
 import yfinance as yf
 import pandas as pd
 import pytz
-from trading_algorithms import STRATEGIES
+from trading_algorithms import STRATEGIES, describe_signal
 
 # Load environment variables
 load_dotenv()
@@ -355,15 +355,29 @@ class LiveTradingAgent:
         end_date = datetime.now()
         start_date = end_date - timedelta(days=lookback_days)
         
+        # Fetch all symbols in one batched request instead of one request per symbol
+        try:
+            history = yf.download(symbols, start=start_date, end=end_date, group_by='ticker',
+                                  auto_adjust=True, threads=True, progress=False)
+        except Exception as e:
+            print(f"Error getting data for {symbols}: {str(e)}")
+            return data
+        
+        if history is None or history.empty:
+            return data
+        
         for symbol in symbols:
-            try:
-                ticker = yf.Ticker(symbol)
-                df = ticker.history(start=start_date, end=end_date)
-                if not df.empty:
-                    data[symbol] = df
-            except Exception as e:
-                print(f"Error getting data for {symbol}: {str(e)}")
-                continue
+            if isinstance(history.columns, pd.MultiIndex):
+                if symbol not in history.columns.get_level_values(0):
+                    continue
+                df = history[symbol]
+            else:
+                df = history
+            
+            # Dates are aligned across symbols, so drop rows that only exist for the others
+            df = df.dropna(how='all')
+            if not df.empty:
+                data[symbol] = df
         
         return data
     
@@ -486,14 +500,14 @@ class LiveTradingAgent:
                         'symbol': symbol,
                         'action': action,
                         'quantity': quantity,
-                        'reason': signal.get('reason', 'Algorithm signal'),
+                        'reason': describe_signal(signal),
                         'order_result': order_result
                     }
                     
                     self.trade_history.append(trade_record)
                     executed_trades.append(trade_record)
                     
-                    print(f"Executed: {action} {quantity} {symbol} - {signal.get('reason', 'Algorithm signal')}")
+                    print(f"Executed: {action} {quantity} {symbol} - {trade_record['reason']}")
                 
             except Exception as e:
                 print(f"Error executing signal: {str(e)}")
@@ -0,0 +1,54 @@
+"""
+Shared pytest fixtures for the trading system tests
+"""
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from backtesting import BacktestingEngine
+from helpers import (SYMBOLS, START_DATE, END_DATE, PAIRS_ENGINE_PARAMS, PAIRS_STRATEGY_PARAMS,
+                     run_pairs_backtest)
+
+CACHE_DIR = '.cache'
+
+@pytest.fixture(scope="session")
+def shared_history():
+    """Fetch the ETF price history once and share it across all backtest tests"""
+    engine = BacktestingEngine()
+    return engine.get_cached_historical_data(SYMBOLS, START_DATE, END_DATE)
+
+@pytest.fixture(scope="session")
+def pairs_backtest_result(shared_history):
+    """
+    Optimized pairs trading backtest, run once per session and pickled to disk
+    
+    The cache key covers the parameters, the price data and the engine/strategy
+    source, so re-downloaded bars or an edit to either module invalidate it instead
+    of serving a stale result.
+    """
+    root = Path(__file__).resolve().parent.parent
+    source = b''.join((root / name).read_bytes() for name in ('backtesting.py', 'trading_algorithms.py'))
+    bars = b''.join(pd.util.hash_pandas_object(shared_history[symbol], index=True).to_numpy().tobytes()
+                    for symbol in SYMBOLS)
+    key = hashlib.sha1(
+        repr((SYMBOLS, START_DATE, END_DATE, sorted(PAIRS_ENGINE_PARAMS.items()),
+              sorted(PAIRS_STRATEGY_PARAMS.items()))).encode() + source + bars
+    ).hexdigest()[:16]
+    cache_path = os.path.join(CACHE_DIR, f"backtest_pairs_{key}.pkl")
+    
+    if os.path.exists(cache_path):
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    
+    result = run_pairs_backtest(shared_history)
+    
+    # Don't cache a backtest that had no data to run on
+    if result.get('portfolio_values'):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(cache_path, 'wb') as f:
+            pickle.dump(result, f, protocol=5)
+    return result
@@ -0,0 +1,72 @@
+"""
+Shared helpers and settings for the trading system tests
+"""
+
+import io
+import sys
+from contextlib import redirect_stdout
+from functools import partial, wraps
+
+SYMBOLS = ['1579.T', '1360.T']
+START_DATE = '2023-01-01'
+END_DATE = '2025-08-05'
+
+# Engine and strategy settings of the optimized pairs backtest used by the P&L tests
+PAIRS_ENGINE_PARAMS = dict(initial_capital=1000000, transaction_cost=0.002, slippage=0.001,
+                           stop_loss=0.05, take_profit=0.15)
+PAIRS_STRATEGY_PARAMS = dict(correlation_threshold=0.6, z_score_threshold=2.5)
+
+# Column formatters for the comparison table
+COMPARISON_FORMATTERS = {
+    'Final Value': '¥{:,.0f}'.format,
+    'Total Return (%)': '{:.2f}'.format,
+    'Max Drawdown (%)': '{:.2f}'.format
+}
+
+def print_table(rows, formatters):
+    """Print a list of dicts as a right-aligned text table"""
+    if not rows:
+        return
+    headers = list(rows[0].keys())
+    cells = [[formatters.get(h, str)(row[h]) for h in headers] for row in rows]
+    widths = [max(len(h), *(len(r[i]) for r in cells)) for i, h in enumerate(headers)]
+    print('  '.join(h.rjust(w) for h, w in zip(headers, widths)))
+    for r in cells:
+        print('  '.join(c.rjust(w) for c, w in zip(r, widths)))
+
+def fast_figure(traces, shapes=(), annotations=(), layout=None):
+    """Build a figure from plain dicts in one go instead of add_trace/add_shape calls"""
+    # Imported here so tests that don't chart anything don't need plotly
+    import plotly.graph_objects as go
+    return go.Figure({
+        'data': list(traces),
+        'layout': {**(layout or {}), 'shapes': list(shapes), 'annotations': list(annotations)}
+    })
+
+def run_pairs_backtest(historical_data=None):
+    """Run the optimized pairs trading backtest over the shared symbols and dates"""
+    # Imported here so scripts that only need the other helpers (e.g. test_system's
+    # dependency checks) don't fail on a missing backtesting dependency
+    from backtesting import BacktestingEngine
+    from trading_algorithms import TradingAlgorithms
+    engine = BacktestingEngine(**PAIRS_ENGINE_PARAMS)
+    return engine.run_backtest(
+        trading_algorithm=partial(TradingAlgorithms.pairs_trading_strategy, **PAIRS_STRATEGY_PARAMS),
+        symbols=SYMBOLS,
+        start_date=START_DATE,
+        end_date=END_DATE,
+        historical_data=historical_data
+    )
+
+def buffered_stdout(func):
+    """Collect everything `func` prints and emit it with a single write when it returns"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        out = io.StringIO()
+        try:
+            with redirect_stdout(out):
+                return func(*args, **kwargs)
+        finally:
+            sys.stdout.write(out.getvalue())
+            sys.stdout.flush()
+    return wrapper
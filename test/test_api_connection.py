@@ -3,14 +3,30 @@
 Test script for KabusAPI connection with detailed error reporting
 """
 
+import logging
 import os
 import sys
-from dotenv import load_dotenv
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-# Load environment variables
-load_dotenv()
+# Load environment variables (skipped when already injected, e.g. by Docker Compose)
+if not os.getenv('KABUSAPI_PASSWORD'):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+# One keep-alive session shared by all probes so the connection is reused
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=4,
+                                     max_retries=Retry(total=2, backoff_factor=0.1)))
+SESSION.headers.update({'Connection': 'keep-alive'})
+
+log = logging.getLogger(__name__)
+
+# Full tracebacks are only printed when STOCKAGENT_VERBOSE=1
+_VERBOSE = os.getenv('STOCKAGENT_VERBOSE', '0') == '1'
 
 def test_api_connection():
     """Test KabusAPI connection with detailed error reporting"""
@@ -41,27 +57,32 @@ def test_api_connection():
     
     print(f"\n🔗 Testing connection to: {token_url}")
     
-    # Test 1: Basic connectivity
-    print(f"\n1️⃣ Testing basic connectivity...")
-    try:
-        response = requests.get(f"http://{host}:{port}", timeout=5)
-        print(f"   ✅ Server is reachable (Status: {response.status_code})")
-    except requests.exceptions.ConnectionError:
-        print(f"   ❌ Connection failed - server may not be running")
-        print(f"   🔍 Check if KabusAPI is running on {host}:{port}")
-        return False
-    except Exception as e:
-        print(f"   ❌ Unexpected error: {str(e)}")
-        return False
-    
-    # Test 2: API endpoint accessibility
-    print(f"\n2️⃣ Testing API endpoint...")
-    try:
-        response = requests.get(base_url, timeout=5)
-        print(f"   ✅ API endpoint accessible (Status: {response.status_code})")
-    except Exception as e:
-        print(f"   ❌ API endpoint error: {str(e)}")
-        return False
+    # Tests 1 and 2 don't depend on each other, so send both probes at once
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        basic_probe = executor.submit(SESSION.get, f"http://{host}:{port}", timeout=5)
+        api_probe = executor.submit(SESSION.get, base_url, timeout=5)
+        
+        # Test 1: Basic connectivity
+        print(f"\n1️⃣ Testing basic connectivity...")
+        try:
+            response = basic_probe.result()
+            print(f"   ✅ Server is reachable (Status: {response.status_code})")
+        except requests.exceptions.ConnectionError:
+            print(f"   ❌ Connection failed - server may not be running")
+            print(f"   🔍 Check if KabusAPI is running on {host}:{port}")
+            return False
+        except Exception as e:
+            print(f"   ❌ Unexpected error: {str(e)}")
+            return False
+        
+        # Test 2: API endpoint accessibility
+        print(f"\n2️⃣ Testing API endpoint...")
+        try:
+            response = api_probe.result()
+            print(f"   ✅ API endpoint accessible (Status: {response.status_code})")
+        except Exception as e:
+            print(f"   ❌ API endpoint error: {str(e)}")
+            return False
     
     # Test 3: Authentication
     print(f"\n3️⃣ Testing authentication...")
@@ -72,10 +93,10 @@ def test_api_connection():
         print(f"   📤 Sending request to: {token_url}")
         print(f"   📋 Request data: {data}")
         
-        response = requests.post(token_url, headers=headers, json=data, timeout=10)
+        response = SESSION.post(token_url, headers=headers, json=data, timeout=10)
         
         print(f"   📡 Response status: {response.status_code}")
-        print(f"   📡 Response headers: {dict(response.headers)}")
+        log.debug('Response headers: %s', response.headers)
         
         # Try to read response content
         try:
@@ -104,7 +125,7 @@ def test_api_connection():
                         symbol_headers = {'X-API-KEY': token}
                         
                         print(f"   📤 Getting symbol info for 1579@1")
-                        symbol_response = requests.get(symbol_url, headers=symbol_headers, timeout=10)
+                        symbol_response = SESSION.get(symbol_url, headers=symbol_headers, timeout=10)
                         
                         print(f"   📡 Symbol response status: {symbol_response.status_code}")
                         if symbol_response.status_code == 200:
@@ -149,8 +170,9 @@ def test_api_connection():
     except Exception as e:
         print(f"   ❌ Unexpected error: {str(e)}")
         print(f"   🔍 Error type: {type(e).__name__}")
-        import traceback
-        print(f"   🔍 Full traceback: {traceback.format_exc()}")
+        if _VERBOSE:
+            import traceback
+            print(f"   🔍 Full traceback: {traceback.format_exc()}")
         return False
 
 def main():
@@ -3,12 +3,71 @@
 Test script for backtesting engine with trading algorithms
 """
 
-from backtesting import BacktestingEngine
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from backtesting import BacktestingEngine, BarsHandle
 from trading_algorithms import STRATEGIES
+from helpers import COMPARISON_FORMATTERS, print_table
 import matplotlib.pyplot as plt
-import pandas as pd
 from datetime import datetime, timedelta
 
+try:
+    import pyarrow as pa
+except ImportError:  # optional - only needed for the Arrow copies of the results
+    pa = None
+
+# Columns of the exported trade and portfolio files (CSV and Arrow)
+TRADE_COLUMNS = ['Strategy', 'Date', 'Symbol', 'Action', 'Quantity', 'Price', 'Reason']
+PORTFOLIO_COLUMNS = ['Strategy', 'Date', 'Portfolio Value', 'Cash']
+
+# Pinned Arrow types, so every strategy's batch has the same schema
+# (cash stays the integer initial capital until a strategy's first trade)
+ARROW_TYPES = {'Price': 'float64', 'Portfolio Value': 'float64', 'Cash': 'float64'}
+
+def _trade_rows(strategy_name, result):
+    """One strategy's trades as rows in TRADE_COLUMNS order"""
+    return ((strategy_name, trade['date'], trade['symbol'], trade['action'],
+             trade['quantity'], trade['price'], trade.get('reason', 'N/A'))
+            for trade in result['trade_history'])
+
+def _portfolio_rows(strategy_name, result):
+    """One strategy's portfolio values as rows in PORTFOLIO_COLUMNS order"""
+    return ((strategy_name, pv['date'], pv['portfolio_value'], pv['cash'])
+            for pv in result['portfolio_values'])
+
+def _write_arrow(path, columns, row_groups):
+    """Write each group of rows (one per strategy) as a record batch of an Arrow IPC file"""
+    writer = None
+    try:
+        for rows in row_groups:
+            rows = list(rows)
+            if not rows:
+                continue
+            arrays = [pa.array(col, type=ARROW_TYPES.get(name)) for name, col in zip(columns, zip(*rows))]
+            batch = pa.RecordBatch.from_arrays(arrays, names=columns)
+            if writer is None:
+                writer = pa.ipc.new_file(path, batch.schema,
+                                         options=pa.ipc.IpcWriteOptions(compression='zstd'))
+            writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+
+def _run_one(name_and_func, symbols, start_date, end_date, initial_capital, bars_meta):
+    """Backtest a single strategy on its own engine (runs in a worker process)"""
+    strategy_name, strategy_func = name_and_func
+    engine = BacktestingEngine(initial_capital=initial_capital)
+    bars = BarsHandle.load(bars_meta)
+    result = engine.run_backtest(
+        trading_algorithm=strategy_func,
+        symbols=symbols,
+        start_date=start_date,
+        end_date=end_date,
+        historical_data=bars
+    )
+    return strategy_name, result
+
 def main():
     # Initialize backtesting engine
     engine = BacktestingEngine(initial_capital=1000000)  # ¥1M initial capital
@@ -23,34 +82,44 @@ def main():
     print(f"Initial capital: ¥{engine.initial_capital:,.0f}")
     print("\n" + "="*50)
     
-    # Test each strategy
+    # Download the price data once and share it with every strategy
+    bars = engine.get_cached_historical_data(symbols, start_date, end_date)
+    
+    # Test each strategy - strategies are independent, so run them in parallel
     results = {}
     
-    for strategy_name, strategy_func in STRATEGIES.items():
-        print(f"\nTesting strategy: {strategy_name}")
-        print("-" * 30)
+    # Workers attach to the bars in shared memory rather than receiving a pickled copy each
+    max_workers = min(len(STRATEGIES), os.cpu_count() or 1)
+    with BarsHandle(bars) as shared_bars, ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_run_one, (name, func), symbols, start_date, end_date,
+                            engine.initial_capital, shared_bars.meta): name
+            for name, func in STRATEGIES.items()
+        }
         
-        try:
-            # Run backtest
-            result = engine.run_backtest(
-                trading_algorithm=strategy_func,
-                symbols=symbols,
-                start_date=start_date,
-                end_date=end_date
-            )
-            
-            # Store results
-            results[strategy_name] = result
+        for future in as_completed(futures):
+            strategy_name = futures[future]
+            print(f"\nTesting strategy: {strategy_name}")
+            print("-" * 30)
             
-            # Print summary
-            print(f"Final Value: ¥{result['final_value']:,.0f}")
-            print(f"Total Return: {result['total_return']:.2f}%")
-            print(f"Max Drawdown: {result['max_drawdown']:.2f}%")
-            print(f"Total Trades: {result['total_trades']}")
-            
-        except Exception as e:
-            print(f"Error testing {strategy_name}: {str(e)}")
-            continue
+            try:
+                _, result = future.result()
+                
+                # Store results
+                results[strategy_name] = result
+                
+                # Print summary
+                print(f"Final Value: ¥{result['final_value']:,.0f}")
+                print(f"Total Return: {result['total_return']:.2f}%")
+                print(f"Max Drawdown: {result['max_drawdown']:.2f}%")
+                print(f"Total Trades: {result['total_trades']}")
+                
+            except Exception as e:
+                print(f"Error testing {strategy_name}: {str(e)}")
+                continue
+    
+    # Keep the registry order for the comparison regardless of completion order
+    results = {name: results[name] for name in STRATEGIES if name in results}
     
     # Compare all strategies
     print("\n" + "="*50)
@@ -67,8 +136,8 @@ def main():
             'Total Trades': result['total_trades']
         })
     
-    df_comparison = pd.DataFrame(comparison_data)
-    print(df_comparison.to_string(index=False))
+    # Print straight from the list of dicts - no DataFrame needed for a few rows
+    print_table(comparison_data, COMPARISON_FORMATTERS)
     
     # Plot results for the best performing strategy
     if results:
@@ -79,39 +148,30 @@ def main():
         # Plot the best strategy
         engine.plot_results(results[best_strategy])
     
-    # Save detailed results to CSV
+    # Save detailed results to CSV, streaming rows straight to disk
     if results:
-        detailed_results = []
-        for strategy_name, result in results.items():
-            for trade in result['trade_history']:
-                detailed_results.append({
-                    'Strategy': strategy_name,
-                    'Date': trade['date'],
-                    'Symbol': trade['symbol'],
-                    'Action': trade['action'],
-                    'Quantity': trade['quantity'],
-                    'Price': trade['price'],
-                    'Reason': trade.get('reason', 'N/A')
-                })
-        
-        df_trades = pd.DataFrame(detailed_results)
-        df_trades.to_csv('backtest_trades.csv', index=False)
+        with open('backtest_trades.csv', 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(TRADE_COLUMNS)
+            for strategy_name, result in results.items():
+                writer.writerows(_trade_rows(strategy_name, result))
         print(f"\nDetailed trade history saved to 'backtest_trades.csv'")
         
         # Save portfolio values
-        portfolio_data = []
-        for strategy_name, result in results.items():
-            for pv in result['portfolio_values']:
-                portfolio_data.append({
-                    'Strategy': strategy_name,
-                    'Date': pv['date'],
-                    'Portfolio Value': pv['portfolio_value'],
-                    'Cash': pv['cash']
-                })
-        
-        df_portfolio = pd.DataFrame(portfolio_data)
-        df_portfolio.to_csv('backtest_portfolio.csv', index=False)
+        with open('backtest_portfolio.csv', 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(PORTFOLIO_COLUMNS)
+            for strategy_name, result in results.items():
+                writer.writerows(_portfolio_rows(strategy_name, result))
         print(f"Portfolio values saved to 'backtest_portfolio.csv'")
+        
+        # Also write Arrow IPC (feather) copies, which reload much faster than the CSVs
+        if pa is not None:
+            _write_arrow('backtest_trades.feather', TRADE_COLUMNS,
+                         (_trade_rows(name, result) for name, result in results.items()))
+            _write_arrow('backtest_portfolio.feather', PORTFOLIO_COLUMNS,
+                         (_portfolio_rows(name, result) for name, result in results.items()))
+            print("Arrow copies saved to 'backtest_trades.feather' and 'backtest_portfolio.feather'")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -6,6 +6,7 @@ Docker test script to verify the trading system works in containerized environme
 import os
 import sys
 from datetime import datetime
+from helpers import buffered_stdout
 
 def test_docker_environment():
     """Test that the Docker environment is properly configured"""
@@ -104,6 +105,7 @@ def test_docker_environment():
     print("\n🎉 Docker environment test completed successfully!")
     return True
 
+@buffered_stdout
 def main():
     """Main test function"""
     print("=" * 50)
@@ -3,12 +3,50 @@
 Test improved strategies with realistic constraints
 """
 
-from backtesting import BacktestingEngine
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from backtesting import BacktestingEngine, BarsHandle
 from trading_algorithms import TradingAlgorithms
-import pandas as pd
+from helpers import COMPARISON_FORMATTERS, PAIRS_STRATEGY_PARAMS, print_table
+import numpy as np
 from datetime import datetime
 
-def test_improved_strategies():
+# Pairs trading with the optimized thresholds (a partial, so it can be pickled)
+OPTIMIZED_PAIRS = partial(TradingAlgorithms.pairs_trading_strategy, **PAIRS_STRATEGY_PARAMS)
+
+# One engine per worker process, reset with each configuration's constraints
+_ENGINE = BacktestingEngine(initial_capital=1000000)
+
+def _run_config(config, symbols, start_date, end_date, bars_meta):
+    """Backtest a single configuration (runs in a worker process)"""
+    engine = _ENGINE
+    engine.reset(**{k: v for k, v in config.items() if k != 'name'})
+    
+    # Choose strategy
+    if 'Combined' in config['name']:
+        if 'Old' in config['name']:
+            # Use old combined strategy (we'll need to revert temporarily)
+            strategy = TradingAlgorithms.combined_strategy
+        else:
+            # Use new improved combined strategy
+            strategy = TradingAlgorithms.combined_strategy
+    else:
+        # Use optimized pairs trading
+        strategy = OPTIMIZED_PAIRS
+    
+    # Run backtest on the shared price data
+    historical_data = BarsHandle.load(bars_meta)
+    result = engine.run_backtest(
+        trading_algorithm=strategy,
+        symbols=symbols,
+        start_date=start_date,
+        end_date=end_date,
+        historical_data=historical_data
+    )
+    return config['name'], result
+
+def test_improved_strategies(shared_history):
     """Test the improved strategies with realistic constraints"""
     
     print("="*60)
@@ -20,6 +58,10 @@ def test_improved_strategies():
     start_date = '2023-01-01'
     end_date = '2025-08-05'
     
+    # Run as a script there is no fixture, so fetch the bars once here rather than per worker
+    if shared_history is None:
+        shared_history = BacktestingEngine().get_cached_historical_data(symbols, start_date, end_date)
+    
     # Test different configurations
     configs = [
         {
@@ -47,65 +89,44 @@ def test_improved_strategies():
     
     results = {}
     
-    for config in configs:
-        print(f"\n📊 Testing: {config['name']}")
-        print("-" * 40)
+    # Configurations are independent, so backtest them in parallel
+    # Workers attach to the bars in shared memory rather than receiving a pickled copy each
+    max_workers = min(len(configs), os.cpu_count() or 1)
+    with BarsHandle(shared_history) as shared_bars, ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_run_config, config, symbols, start_date, end_date, shared_bars.meta)
+            for config in configs
+        ]
         
-        # Initialize backtesting engine with constraints
-        engine = BacktestingEngine(
-            initial_capital=1000000,
-            transaction_cost=config['transaction_cost'],
-            slippage=config['slippage'],
-            stop_loss=config['stop_loss'],
-            take_profit=config['take_profit']
-        )
-        
-        # Choose strategy
-        if 'Combined' in config['name']:
-            if 'Old' in config['name']:
-                # Use old combined strategy (we'll need to revert temporarily)
-                strategy = TradingAlgorithms.combined_strategy
-            else:
-                # Use new improved combined strategy
-                strategy = TradingAlgorithms.combined_strategy
-        else:
-            # Use optimized pairs trading
-            def optimized_pairs_strategy(data, current_prices):
-                return TradingAlgorithms.pairs_trading_strategy(
-                    data, current_prices, 
-                    correlation_threshold=0.6, 
-                    z_score_threshold=2.5
+        for future in as_completed(futures):
+            name, result = future.result()
+            print(f"\n📊 Testing: {name}")
+            print("-" * 40)
+            
+            # Store results
+            results[name] = result
+            
+            # Print results
+            print(f"Final Value: ¥{result['final_value']:,.0f}")
+            print(f"Total Return: {result['total_return']:.2f}%")
+            print(f"Max Drawdown: {result['max_drawdown']:.2f}%")
+            print(f"Total Trades: {result['total_trades']}")
+            
+            # Calculate transaction costs
+            if result['trade_history']:
+                # One pass over the trades, then a single column-wise reduction
+                costs = np.array(
+                    [(trade.get('transaction_fee', 0), trade.get('slippage_cost', 0))
+                     for trade in result['trade_history']],
+                    dtype=np.float64
                 )
-            strategy = optimized_pairs_strategy
-        
-        # Run backtest
-        result = engine.run_backtest(
-            trading_algorithm=strategy,
-            symbols=symbols,
-            start_date=start_date,
-            end_date=end_date
-        )
-        
-        # Store results
-        results[config['name']] = result
-        
-        # Print results
-        print(f"Final Value: ¥{result['final_value']:,.0f}")
-        print(f"Total Return: {result['total_return']:.2f}%")
-        print(f"Max Drawdown: {result['max_drawdown']:.2f}%")
-        print(f"Total Trades: {result['total_trades']}")
-        
-        # Calculate transaction costs
-        if result['trade_history']:
-            total_transaction_fees = sum(
-                trade.get('transaction_fee', 0) for trade in result['trade_history']
-            )
-            total_slippage = sum(
-                trade.get('slippage_cost', 0) for trade in result['trade_history']
-            )
-            print(f"Total Transaction Fees: ¥{total_transaction_fees:,.0f}")
-            print(f"Total Slippage Costs: ¥{total_slippage:,.0f}")
-            print(f"Total Trading Costs: ¥{total_transaction_fees + total_slippage:,.0f}")
+                total_transaction_fees, total_slippage = costs.sum(axis=0)
+                print(f"Total Transaction Fees: ¥{total_transaction_fees:,.0f}")
+                print(f"Total Slippage Costs: ¥{total_slippage:,.0f}")
+                print(f"Total Trading Costs: ¥{total_transaction_fees + total_slippage:,.0f}")
+    
+    # Keep the configuration order for the comparison regardless of completion order
+    results = {config['name']: results[config['name']] for config in configs}
     
     # Compare results
     print(f"\n" + "="*60)
@@ -122,8 +143,8 @@ def test_improved_strategies():
             'Total Trades': result['total_trades']
         })
     
-    df_comparison = pd.DataFrame(comparison_data)
-    print(df_comparison.to_string(index=False))
+    # Print straight from the list of dicts - no DataFrame needed for a few rows
+    print_table(comparison_data, COMPARISON_FORMATTERS)
     
     # Recommendations
     print(f"\n💡 RECOMMENDATIONS:")
@@ -136,4 +157,4 @@ def test_improved_strategies():
     return results
 
 if __name__ == "__main__":
-    test_improved_strategies() 
\ No newline at end of file
+    test_improved_strategies(shared_history=None) 
\ No newline at end of file
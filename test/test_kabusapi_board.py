@@ -7,18 +7,28 @@ import os
 import sys
 import requests
 import json
-from dotenv import load_dotenv
 
-# Add parent directory to path to import live_trading
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from live_trading import KabusAPIClient
+# Load environment variables (skipped when already injected, e.g. by Docker Compose)
+if not os.getenv('KABUSAPI_PASSWORD'):
+    from dotenv import load_dotenv
+    load_dotenv()
 
-# Load environment variables
-load_dotenv()
+# Reuse one connection for all board requests
+SESSION = requests.Session()
+
+# Responses larger than this are not pretty-printed in full
+MAX_RAW_RESPONSE_BYTES = 4096
+
+# Full tracebacks are only printed when STOCKAGENT_VERBOSE=1
+_VERBOSE = os.getenv('STOCKAGENT_VERBOSE', '0') == '1'
 
 def test_kabusapi_board():
     """Test KabusAPI board endpoint for market prices"""
     
+    # Imported here so collecting this module doesn't load live_trading and its dependencies
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from live_trading import KabusAPIClient
+    
     print("🔍 Testing KabusAPI Board Endpoint")
     print("=" * 50)
     
@@ -63,45 +73,51 @@ def test_kabusapi_board():
             print(f"  📡 URL: {url}")
             print(f"  📋 Headers: {headers}")
             
-            response = requests.get(url, headers=headers, timeout=10)
-            
-            print(f"  📥 Status Code: {response.status_code}")
-            print(f"  📥 Response Headers: {dict(response.headers)}")
-            
-            if response.status_code == 200:
-                result = response.json()
-                print(f"  📄 Raw Response:")
-                print(json.dumps(result, indent=2, ensure_ascii=False))
+            with SESSION.get(url, headers=headers, timeout=10) as response:
+                print(f"  📥 Status Code: {response.status_code}")
+                print(f"  📥 Content-Type: {response.headers.get('Content-Type')} "
+                      f"Length: {response.headers.get('Content-Length')}")
                 
-                # Analyze response structure
-                print(f"\n  🔍 Response Analysis:")
-                print(f"    ResultCode: {result.get('ResultCode')}")
-                print(f"    ResultText: {result.get('ResultText')}")
-                
-                if 'Board' in result:
-                    board = result['Board']
-                    print(f"    Board keys: {list(board.keys())}")
+                if response.status_code == 200:
+                    result = response.json()
+                    if len(response.content) > MAX_RAW_RESPONSE_BYTES:
+                        # Too large to dump in full - only show the part analyzed below
+                        print(f"  📄 Board Response ({len(response.content)} bytes, raw dump skipped):")
+                        print(json.dumps(result.get('Board', {}), indent=2, ensure_ascii=False))
+                    else:
+                        print(f"  📄 Raw Response:")
+                        print(json.dumps(result, indent=2, ensure_ascii=False))
                     
-                    # Look for price fields
-                    price_fields = [
-                        'CurrentPrice', 'PrevClose', 'Open', 'High', 'Low',
-                        'AskPrice', 'BidPrice', 'LastPrice', 'MarketOrderAcceptableTime'
-                    ]
+                    # Analyze response structure
+                    print(f"\n  🔍 Response Analysis:")
+                    print(f"    ResultCode: {result.get('ResultCode')}")
+                    print(f"    ResultText: {result.get('ResultText')}")
                     
-                    for field in price_fields:
-                        if field in board:
-                            print(f"    {field}: {board[field]}")
+                    if 'Board' in result:
+                        board = result['Board']
+                        print(f"    Board keys: {list(board.keys())}")
+                        
+                        # Look for price fields
+                        price_fields = [
+                            'CurrentPrice', 'PrevClose', 'Open', 'High', 'Low',
+                            'AskPrice', 'BidPrice', 'LastPrice', 'MarketOrderAcceptableTime'
+                        ]
+                        
+                        for field in price_fields:
+                            if field in board:
+                                print(f"    {field}: {board[field]}")
+                    else:
+                        print("    No 'Board' key found in response")
+                        
                 else:
-                    print("    No 'Board' key found in response")
-                    
-            else:
-                print(f"  ❌ HTTP Error: {response.status_code}")
-                print(f"  📄 Error Response: {response.text}")
+                    print(f"  ❌ HTTP Error: {response.status_code}")
+                    print(f"  📄 Error Response: {response.text}")
                 
         except Exception as e:
             print(f"  ❌ Exception: {str(e)}")
-            import traceback
-            print(f"  🔍 Traceback: {traceback.format_exc()}")
+            if _VERBOSE:
+                import traceback
+                print(f"  🔍 Traceback: {traceback.format_exc()}")
     
     # Step 4: Test get_market_price method
     print(f"\n\nStep 4: Testing get_market_price method...")
@@ -115,8 +131,9 @@ def test_kabusapi_board():
             
     except Exception as e:
         print(f"❌ get_market_price error: {str(e)}")
-        import traceback
-        print(f"🔍 Traceback: {traceback.format_exc()}")
+        if _VERBOSE:
+            import traceback
+            print(f"🔍 Traceback: {traceback.format_exc()}")
 
 if __name__ == "__main__":
     test_kabusapi_board()
\ No newline at end of file
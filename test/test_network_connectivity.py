@@ -3,13 +3,29 @@
 Test network connectivity from container to host
 """
 
+import asyncio
 import os
 import requests
 import socket
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
 
-# Load environment variables
-load_dotenv()
+# Load environment variables (skipped when already injected, e.g. by Docker Compose)
+if not os.getenv('KABUSAPI_PASSWORD'):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+# One session shared by all HTTP probes so connections are reused
+SESSION = requests.Session()
+
+# Seconds to wait for the TCP handshake before treating the host as unreachable
+TCP_PROBE_TIMEOUT = 1.0
+
+async def _tcp_probe(host, port):
+    """Open and close a TCP connection, giving up after TCP_PROBE_TIMEOUT"""
+    _, writer = await asyncio.wait_for(asyncio.open_connection(host, port),
+                                       timeout=TCP_PROBE_TIMEOUT)
+    writer.close()
+    await writer.wait_closed()
 
 def test_network_connectivity():
     """Test network connectivity to host services"""
@@ -44,17 +60,12 @@ def test_network_connectivity():
     # Test 2: TCP connection
     print(f"\n2️⃣ Testing TCP connection...")
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(5)
-        result = sock.connect_ex((host, int(port)))
-        sock.close()
-        
-        if result == 0:
-            print(f"   ✅ TCP connection successful: {host}:{port}")
-        else:
-            print(f"   ❌ TCP connection failed: {host}:{port}")
-            print(f"   🔍 Error code: {result}")
-            return False
+        asyncio.run(_tcp_probe(host, int(port)))
+        print(f"   ✅ TCP connection successful: {host}:{port}")
+    except (asyncio.TimeoutError, OSError) as e:
+        print(f"   ❌ TCP connection failed: {host}:{port}")
+        print(f"   🔍 Error: {str(e) or type(e).__name__}")
+        return False
     except Exception as e:
         print(f"   ❌ TCP connection error: {str(e)}")
         return False
@@ -63,7 +74,7 @@ def test_network_connectivity():
     print(f"\n3️⃣ Testing HTTP connection...")
     try:
         url = f"http://{host}:{port}"
-        response = requests.get(url, timeout=5)
+        response = SESSION.get(url, timeout=5)
         print(f"   ✅ HTTP connection successful: {url}")
         print(f"   📡 Status code: {response.status_code}")
         return True
@@ -90,28 +101,33 @@ def test_api_endpoints():
         port = '18081'
     
     base_url = f"http://{host}:{port}/kabusapi"
-    
-    # Test API base endpoint
-    try:
-        response = requests.get(base_url, timeout=5)
-        print(f"   ✅ API base endpoint accessible: {base_url}")
-        print(f"   📡 Status: {response.status_code}")
-    except Exception as e:
-        print(f"   ❌ API base endpoint error: {str(e)}")
-        return False
-    
-    # Test token endpoint (without authentication)
-    try:
-        token_url = f"{base_url}/token"
-        response = requests.post(token_url, 
-                               json={'APIPassword': 'test'}, 
-                               timeout=5)
-        print(f"   ✅ Token endpoint accessible: {token_url}")
-        print(f"   📡 Status: {response.status_code}")
-        return True
-    except Exception as e:
-        print(f"   ❌ Token endpoint error: {str(e)}")
-        return False
+    token_url = f"{base_url}/token"
+    
+    # Probe both endpoints at once instead of paying each round trip in turn
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        base_probe = executor.submit(SESSION.get, base_url, timeout=5)
+        token_probe = executor.submit(SESSION.post, token_url,
+                                      json={'APIPassword': 'test'},
+                                      timeout=5)
+        
+        # Test API base endpoint
+        try:
+            response = base_probe.result()
+            print(f"   ✅ API base endpoint accessible: {base_url}")
+            print(f"   📡 Status: {response.status_code}")
+        except Exception as e:
+            print(f"   ❌ API base endpoint error: {str(e)}")
+            return False
+        
+        # Test token endpoint (without authentication)
+        try:
+            response = token_probe.result()
+            print(f"   ✅ Token endpoint accessible: {token_url}")
+            print(f"   📡 Status: {response.status_code}")
+            return True
+        except Exception as e:
+            print(f"   ❌ Token endpoint error: {str(e)}")
+            return False
 
 def main():
     """Main function"""
@@ -4,9 +4,9 @@ Test the Plotly chart fix for dual y-axis compatibility
 """
 
 import pandas as pd
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import numpy as np
+from helpers import fast_figure
 
 def test_plotly_chart():
     """Test the fixed Plotly chart creation"""
@@ -17,9 +17,13 @@ def test_plotly_chart():
     
     # Create sample data
     dates = pd.date_range(start='2023-01-01', end='2023-12-31', freq='D')
-    portfolio_values = 1000000 + np.cumsum(np.random.randn(len(dates)) * 1000)
-    realized_pnl = np.cumsum(np.random.randn(len(dates)) * 500)
-    unrealized_pnl = np.cumsum(np.random.randn(len(dates)) * 300)
+    # One (3, n) block of random walks, scaled and summed in place
+    rng = np.random.default_rng(0)
+    walks = rng.standard_normal((3, len(dates)))
+    walks *= np.array([[1000], [500], [300]])
+    np.cumsum(walks, axis=1, out=walks)
+    walks[0] += 1000000
+    portfolio_values, realized_pnl, unrealized_pnl = walks
     total_pnl = realized_pnl + unrealized_pnl
     
     # Create DataFrame
@@ -33,112 +37,55 @@ def test_plotly_chart():
     
     print("📊 Creating dual y-axis chart with fixed implementation...")
     
-    # Create figure with secondary y-axis
-    fig = go.Figure()
+    # Plain typed arrays for the traces: float32 halves the base64 payload in to_json,
+    # and the dates are converted once rather than per trace
+    dates_ms = portfolio_df['date'].to_numpy(dtype='datetime64[ms]')
+    series = {col: portfolio_df[col].to_numpy(dtype=np.float32)
+              for col in ['portfolio_value', 'realized_pnl', 'unrealized_pnl', 'total_pnl']}
     
-    # Portfolio Value (primary y-axis)
-    fig.add_trace(go.Scatter(
-        x=portfolio_df['date'],
-        y=portfolio_df['portfolio_value'],
-        mode='lines',
-        name='Portfolio Value',
-        line=dict(color='blue', width=2),
-        yaxis='y'
-    ))
-    
-    # Realized P&L (secondary y-axis)
-    fig.add_trace(go.Scatter(
-        x=portfolio_df['date'],
-        y=portfolio_df['realized_pnl'],
-        mode='lines',
-        name='Realized P&L',
-        line=dict(color='green', width=2, dash='dash'),
-        yaxis='y2'
-    ))
-    
-    # Unrealized P&L (secondary y-axis)
-    fig.add_trace(go.Scatter(
-        x=portfolio_df['date'],
-        y=portfolio_df['unrealized_pnl'],
-        mode='lines',
-        name='Unrealized P&L',
-        line=dict(color='orange', width=2, dash='dot'),
-        yaxis='y2'
-    ))
-    
-    # Total P&L (secondary y-axis)
-    fig.add_trace(go.Scatter(
-        x=portfolio_df['date'],
-        y=portfolio_df['total_pnl'],
-        mode='lines',
-        name='Total P&L',
-        line=dict(color='red', width=2),
-        yaxis='y2'
-    ))
-    
-    # Add horizontal lines using shapes (FIXED METHOD)
+    # Build the whole figure from plain dicts - one validation pass instead of one per add_* call
     initial_capital = 1000000
-    
-    # Initial capital line
-    fig.add_shape(
-        type="line",
-        x0=portfolio_df['date'].min(),
-        x1=portfolio_df['date'].max(),
-        y0=initial_capital,
-        y1=initial_capital,
-        line=dict(color="gray", dash="dash"),
-        yref="y"
-    )
-    fig.add_annotation(
-        x=portfolio_df['date'].max(),
-        y=initial_capital,
-        text="Initial Capital",
-        showarrow=False,
-        yref="y"
-    )
-    
-    # Break-even line for P&L
-    fig.add_shape(
-        type="line",
-        x0=portfolio_df['date'].min(),
-        x1=portfolio_df['date'].max(),
-        y0=0,
-        y1=0,
-        line=dict(color="gray", dash="dash"),
-        yref="y2"
-    )
-    fig.add_annotation(
-        x=portfolio_df['date'].max(),
-        y=0,
-        text="Break-even",
-        showarrow=False,
-        yref="y2"
-    )
-    
-    # Update layout with dual y-axes
-    fig.update_layout(
-        title="Portfolio Value and P&L Over Time",
-        xaxis_title="Date",
-        yaxis=dict(
-            title="Portfolio Value (¥)",
-            side="left",
-            showgrid=True
-        ),
-        yaxis2=dict(
-            title="P&L (¥)",
-            side="right",
-            overlaying="y",
-            showgrid=False
-        ),
-        height=500,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        )
-    )
+    date_min = portfolio_df['date'].min()
+    date_max = portfolio_df['date'].max()
+    
+    traces = [
+        # Portfolio Value (primary y-axis)
+        {'type': 'scatter', 'x': dates_ms, 'y': series['portfolio_value'],
+         'mode': 'lines', 'name': 'Portfolio Value', 'line': {'color': 'blue', 'width': 2}, 'yaxis': 'y'},
+        # Realized P&L (secondary y-axis)
+        {'type': 'scatter', 'x': dates_ms, 'y': series['realized_pnl'],
+         'mode': 'lines', 'name': 'Realized P&L', 'line': {'color': 'green', 'width': 2, 'dash': 'dash'}, 'yaxis': 'y2'},
+        # Unrealized P&L (secondary y-axis)
+        {'type': 'scatter', 'x': dates_ms, 'y': series['unrealized_pnl'],
+         'mode': 'lines', 'name': 'Unrealized P&L', 'line': {'color': 'orange', 'width': 2, 'dash': 'dot'}, 'yaxis': 'y2'},
+        # Total P&L (secondary y-axis)
+        {'type': 'scatter', 'x': dates_ms, 'y': series['total_pnl'],
+         'mode': 'lines', 'name': 'Total P&L', 'line': {'color': 'red', 'width': 2}, 'yaxis': 'y2'}
+    ]
+    
+    # Horizontal lines using shapes (FIXED METHOD): initial capital and P&L break-even
+    shapes = [
+        {'type': 'line', 'x0': date_min, 'x1': date_max, 'y0': initial_capital, 'y1': initial_capital,
+         'line': {'color': 'gray', 'dash': 'dash'}, 'yref': 'y'},
+        {'type': 'line', 'x0': date_min, 'x1': date_max, 'y0': 0, 'y1': 0,
+         'line': {'color': 'gray', 'dash': 'dash'}, 'yref': 'y2'}
+    ]
+    annotations = [
+        {'x': date_max, 'y': initial_capital, 'text': 'Initial Capital', 'showarrow': False, 'yref': 'y'},
+        {'x': date_max, 'y': 0, 'text': 'Break-even', 'showarrow': False, 'yref': 'y2'}
+    ]
+    
+    # Layout with dual y-axes
+    layout = {
+        'title': {'text': 'Portfolio Value and P&L Over Time'},
+        'xaxis': {'title': {'text': 'Date'}},
+        'yaxis': {'title': {'text': 'Portfolio Value (¥)'}, 'side': 'left', 'showgrid': True},
+        'yaxis2': {'title': {'text': 'P&L (¥)'}, 'side': 'right', 'overlaying': 'y', 'showgrid': False},
+        'height': 500,
+        'legend': {'orientation': 'h', 'yanchor': 'bottom', 'y': 1.02, 'xanchor': 'right', 'x': 1}
+    }
+    
+    fig = fast_figure(traces, shapes, annotations, layout)
     
     print("✅ Chart created successfully!")
     print(f"✅ Chart has {len(fig.data)} traces")
@@ -3,47 +3,25 @@
 Test P&L tracking functionality
 """
 
-from backtesting import BacktestingEngine
-from trading_algorithms import TradingAlgorithms
-import pandas as pd
+from helpers import buffered_stdout, run_pairs_backtest
+import numpy as np
 from datetime import datetime
 
-def test_pnl_tracking():
+@buffered_stdout
+def test_pnl_tracking(shared_history, pairs_backtest_result):
     """Test the P&L tracking functionality"""
     
     print("="*60)
     print("P&L TRACKING TEST")
     print("="*60)
     
-    # Test parameters
-    symbols = ['1579.T', '1360.T']
-    start_date = '2023-01-01'
-    end_date = '2025-08-05'
-    
-    # Initialize backtesting engine with P&L tracking
-    engine = BacktestingEngine(
-        initial_capital=1000000,
-        transaction_cost=0.002,
-        slippage=0.001,
-        stop_loss=0.05,
-        take_profit=0.15
-    )
-    
-    # Test optimized pairs trading
-    def optimized_pairs_strategy(data, current_prices):
-        return TradingAlgorithms.pairs_trading_strategy(
-            data, current_prices, 
-            correlation_threshold=0.6, 
-            z_score_threshold=2.5
-        )
-    
-    print("📊 Running backtest with P&L tracking...")
-    result = engine.run_backtest(
-        trading_algorithm=optimized_pairs_strategy,
-        symbols=symbols,
-        start_date=start_date,
-        end_date=end_date
-    )
+    # Reuse the session's cached backtest when run under pytest
+    if pairs_backtest_result is not None:
+        print("📊 Using cached backtest for P&L tracking...")
+        result = pairs_backtest_result
+    else:
+        print("📊 Running backtest with P&L tracking...")
+        result = run_pairs_backtest(shared_history)
     
     # Display P&L results
     print(f"\n💰 P&L ANALYSIS:")
@@ -61,53 +39,60 @@ def test_pnl_tracking():
     
     # Analyze individual trades
     if result['trade_history']:
-        trades_df = pd.DataFrame(result['trade_history'])
+        # Pull the columns we filter on into typed arrays once instead of building a DataFrame
+        trades = result['trade_history']
+        actions = np.array([trade['action'] for trade in trades])
+        pnls = np.array([trade.get('pnl', 0.0) for trade in trades], dtype=np.float64)
         
         print(f"\n📋 TRADE ANALYSIS:")
-        print(f"Total Trades: {len(trades_df)}")
+        print(f"Total Trades: {len(trades)}")
         
         # Separate buy and sell trades
-        buy_trades = trades_df[trades_df['action'] == 'BUY']
-        sell_trades = trades_df[trades_df['action'] == 'SELL']
+        buy_mask = actions == 'BUY'
+        sell_mask = actions == 'SELL'
         
-        print(f"Buy Trades: {len(buy_trades)}")
-        print(f"Sell Trades: {len(sell_trades)}")
+        print(f"Buy Trades: {int(buy_mask.sum())}")
+        print(f"Sell Trades: {int(sell_mask.sum())}")
         
-        if not sell_trades.empty:
-            profitable_trades = sell_trades[sell_trades['pnl'] > 0]
-            losing_trades = sell_trades[sell_trades['pnl'] < 0]
+        if sell_mask.any():
+            sell_pnl = pnls[sell_mask]
+            wins = sell_pnl[sell_pnl > 0]
+            losses = sell_pnl[sell_pnl < 0]
             
             print(f"\n💹 PROFITABLE TRADES:")
-            print(f"Count: {len(profitable_trades)}")
-            if len(profitable_trades) > 0:
-                print(f"Average P&L: ¥{profitable_trades['pnl'].mean():,.0f}")
-                print(f"Best Trade: ¥{profitable_trades['pnl'].max():,.0f}")
+            print(f"Count: {len(wins)}")
+            if len(wins) > 0:
+                print(f"Average P&L: ¥{wins.mean():,.0f}")
+                print(f"Best Trade: ¥{wins.max():,.0f}")
             
             print(f"\n📉 LOSING TRADES:")
-            print(f"Count: {len(losing_trades)}")
-            if len(losing_trades) > 0:
-                print(f"Average P&L: ¥{losing_trades['pnl'].mean():,.0f}")
-                print(f"Worst Trade: ¥{losing_trades['pnl'].min():,.0f}")
+            print(f"Count: {len(losses)}")
+            if len(losses) > 0:
+                print(f"Average P&L: ¥{losses.mean():,.0f}")
+                print(f"Worst Trade: ¥{losses.min():,.0f}")
         
         # Show some sample trades
         print(f"\n📝 SAMPLE TRADES:")
-        sample_trades = sell_trades.head(5) if len(sell_trades) > 0 else trades_df.head(5)
-        for idx, trade in sample_trades.iterrows():
+        sample_idx = np.flatnonzero(sell_mask)[:5] if sell_mask.any() else range(min(5, len(trades)))
+        for idx in sample_idx:
+            trade = trades[idx]
             print(f"{trade['date'].strftime('%Y-%m-%d')} | {trade['symbol']} | {trade['action']} | "
                   f"¥{trade['price']:,.0f} | P&L: ¥{trade.get('pnl', 0):,.0f}")
     
     # Portfolio value analysis with P&L
     if result['portfolio_values']:
-        portfolio_df = pd.DataFrame(result['portfolio_values'])
+        # Only the first and last snapshots are needed, so index the records directly
+        pv = result['portfolio_values']
+        first, last = pv[0], pv[-1]
         
         print(f"\n📊 PORTFOLIO ANALYSIS:")
-        print(f"Starting Value: ¥{portfolio_df['portfolio_value'].iloc[0]:,.0f}")
-        print(f"Ending Value: ¥{portfolio_df['portfolio_value'].iloc[-1]:,.0f}")
+        print(f"Starting Value: ¥{first['portfolio_value']:,.0f}")
+        print(f"Ending Value: ¥{last['portfolio_value']:,.0f}")
         
-        if 'realized_pnl' in portfolio_df.columns:
-            print(f"Final Realized P&L: ¥{portfolio_df['realized_pnl'].iloc[-1]:,.0f}")
-            print(f"Final Unrealized P&L: ¥{portfolio_df['unrealized_pnl'].iloc[-1]:,.0f}")
-            print(f"Final Total P&L: ¥{portfolio_df['total_pnl'].iloc[-1]:,.0f}")
+        if 'realized_pnl' in last:
+            print(f"Final Realized P&L: ¥{last.get('realized_pnl', 0):,.0f}")
+            print(f"Final Unrealized P&L: ¥{last.get('unrealized_pnl', 0):,.0f}")
+            print(f"Final Total P&L: ¥{last.get('total_pnl', 0):,.0f}")
         
         # Calculate P&L contribution to total return
         total_pnl_contribution = result['realized_pnl'] / result['initial_capital'] * 100
@@ -116,4 +101,4 @@ def test_pnl_tracking():
     return result
 
 if __name__ == "__main__":
-    test_pnl_tracking() 
\ No newline at end of file
+    test_pnl_tracking(shared_history=None, pairs_backtest_result=None) 
\ No newline at end of file
@@ -3,51 +3,42 @@
 Test P&L visualization functionality
 """
 
-from backtesting import BacktestingEngine
-from trading_algorithms import TradingAlgorithms
+from helpers import fast_figure, run_pairs_backtest
 import pandas as pd
-import plotly.graph_objects as go
+import numpy as np
 from datetime import datetime
 
-def test_pnl_visualization():
+def _frame_from_records(records, columns):
+    """
+    Build a DataFrame column by column from a list of dicts instead of letting pandas
+    infer them row by row. Only the `columns` the records actually have are kept, so
+    a field the engine stops emitting shows up as a missing column.
+    """
+    if records:
+        columns = [col for col in columns if col in records[0]]
+    return pd.DataFrame({col: [record.get(col, np.nan) for record in records] for col in columns})
+
+def test_pnl_visualization(shared_history, pairs_backtest_result):
     """Test P&L visualization with sample data"""
     
     print("="*60)
     print("P&L VISUALIZATION TEST")
     print("="*60)
     
-    # Test parameters
-    symbols = ['1579.T', '1360.T']
-    start_date = '2023-01-01'
-    end_date = '2025-08-05'
-    
-    # Initialize backtesting engine
-    engine = BacktestingEngine(
-        initial_capital=1000000,
-        transaction_cost=0.002,
-        slippage=0.001,
-        stop_loss=0.05,
-        take_profit=0.15
-    )
-    
-    # Test optimized pairs trading
-    def optimized_pairs_strategy(data, current_prices):
-        return TradingAlgorithms.pairs_trading_strategy(
-            data, current_prices, 
-            correlation_threshold=0.6, 
-            z_score_threshold=2.5
-        )
-    
-    print("📊 Running backtest with P&L visualization...")
-    result = engine.run_backtest(
-        trading_algorithm=optimized_pairs_strategy,
-        symbols=symbols,
-        start_date=start_date,
-        end_date=end_date
-    )
+    # Reuse the session's cached backtest when run under pytest
+    if pairs_backtest_result is not None:
+        print("📊 Using cached backtest for P&L visualization...")
+        result = pairs_backtest_result
+    else:
+        print("📊 Running backtest with P&L visualization...")
+        result = run_pairs_backtest(shared_history)
     
     # Test portfolio data structure
-    portfolio_df = pd.DataFrame(result['portfolio_values'])
+    # The nested per-tick positions dicts aren't charted, so they are left out
+    portfolio_df = _frame_from_records(
+        result['portfolio_values'],
+        ['date', 'portfolio_value', 'cash', 'realized_pnl', 'unrealized_pnl', 'total_pnl']
+    )
     print(f"\n📈 PORTFOLIO DATA STRUCTURE:")
     print(f"Columns: {list(portfolio_df.columns)}")
     print(f"Rows: {len(portfolio_df)}")
@@ -61,119 +52,96 @@ def test_pnl_visualization():
         else:
             print(f"❌ {col}: Missing")
     
+    # Trades as a frame, built once for the structure checks and the P&L histogram
+    trades_df = _frame_from_records(
+        result['trade_history'],
+        ['date', 'symbol', 'action', 'quantity', 'price', 'transaction_fee', 'slippage_cost', 'pnl']
+    )
+    sell_trades = trades_df[trades_df['action'] == 'SELL']
+    
     # Test trade data structure
-    if result['trade_history']:
-        trades_df = pd.DataFrame(result['trade_history'])
+    if len(trades_df) > 0:
         print(f"\n📋 TRADE DATA STRUCTURE:")
         print(f"Columns: {list(trades_df.columns)}")
         print(f"Total trades: {len(trades_df)}")
         
-        # Check P&L columns in trades
-        if 'pnl' in trades_df.columns:
-            sell_trades = trades_df[trades_df['action'] == 'SELL']
-            if len(sell_trades) > 0:
-                print(f"✅ P&L data available for {len(sell_trades)} sell trades")
-                print(f"   P&L range: {sell_trades['pnl'].min():.0f} to {sell_trades['pnl'].max():.0f}")
-                print(f"   Profitable trades: {(sell_trades['pnl'] > 0).sum()}")
-                print(f"   Losing trades: {(sell_trades['pnl'] < 0).sum()}")
-            else:
-                print("⚠️ No sell trades to analyze P&L")
-        else:
+        # Check P&L of the closed trades
+        if 'pnl' not in trades_df.columns:
             print("❌ P&L column missing from trade history")
+        elif len(sell_trades) > 0:
+            print(f"✅ P&L data available for {len(sell_trades)} sell trades")
+            print(f"   P&L range: {sell_trades['pnl'].min():.0f} to {sell_trades['pnl'].max():.0f}")
+            print(f"   Profitable trades: {(sell_trades['pnl'] > 0).sum()}")
+            print(f"   Losing trades: {(sell_trades['pnl'] < 0).sum()}")
+        else:
+            print("⚠️ No sell trades to analyze P&L")
     
     # Test chart creation
     print(f"\n📊 TESTING CHART CREATION:")
     
-    # Portfolio and P&L chart
-    fig = go.Figure()
+    # Plain typed arrays for the traces: float32 halves the base64 payload in to_json,
+    # and the dates are converted once rather than per trace (keeping exchange-local time)
+    dates_ms = portfolio_df['date'].dt.tz_localize(None).to_numpy(dtype='datetime64[ms]')
+    series = {col: portfolio_df[col].to_numpy(dtype=np.float32)
+              for col in ['portfolio_value', 'realized_pnl', 'unrealized_pnl', 'total_pnl']
+              if col in portfolio_df.columns}
     
-    # Portfolio Value (primary y-axis)
-    fig.add_trace(go.Scatter(
-        x=portfolio_df['date'],
-        y=portfolio_df['portfolio_value'],
-        mode='lines',
-        name='Portfolio Value',
-        line=dict(color='blue', width=2),
-        yaxis='y'
-    ))
+    # Portfolio and P&L chart, assembled from plain dicts and validated once
+    traces = [
+        # Portfolio Value (primary y-axis)
+        {'type': 'scatter', 'x': dates_ms, 'y': series['portfolio_value'],
+         'mode': 'lines', 'name': 'Portfolio Value', 'line': {'color': 'blue', 'width': 2}, 'yaxis': 'y'}
+    ]
     
     # Realized P&L (secondary y-axis)
     if 'realized_pnl' in portfolio_df.columns:
-        fig.add_trace(go.Scatter(
-            x=portfolio_df['date'],
-            y=portfolio_df['realized_pnl'],
-            mode='lines',
-            name='Realized P&L',
-            line=dict(color='green', width=2, dash='dash'),
-            yaxis='y2'
-        ))
+        traces.append({'type': 'scatter', 'x': dates_ms, 'y': series['realized_pnl'],
+                       'mode': 'lines', 'name': 'Realized P&L',
+                       'line': {'color': 'green', 'width': 2, 'dash': 'dash'}, 'yaxis': 'y2'})
         print("✅ Realized P&L chart trace added")
     
     # Unrealized P&L (secondary y-axis)
     if 'unrealized_pnl' in portfolio_df.columns:
-        fig.add_trace(go.Scatter(
-            x=portfolio_df['date'],
-            y=portfolio_df['unrealized_pnl'],
-            mode='lines',
-            name='Unrealized P&L',
-            line=dict(color='orange', width=2, dash='dot'),
-            yaxis='y2'
-        ))
+        traces.append({'type': 'scatter', 'x': dates_ms, 'y': series['unrealized_pnl'],
+                       'mode': 'lines', 'name': 'Unrealized P&L',
+                       'line': {'color': 'orange', 'width': 2, 'dash': 'dot'}, 'yaxis': 'y2'})
         print("✅ Unrealized P&L chart trace added")
     
     # Total P&L (secondary y-axis)
     if 'total_pnl' in portfolio_df.columns:
-        fig.add_trace(go.Scatter(
-            x=portfolio_df['date'],
-            y=portfolio_df['total_pnl'],
-            mode='lines',
-            name='Total P&L',
-            line=dict(color='red', width=2),
-            yaxis='y2'
-        ))
+        traces.append({'type': 'scatter', 'x': dates_ms, 'y': series['total_pnl'],
+                       'mode': 'lines', 'name': 'Total P&L',
+                       'line': {'color': 'red', 'width': 2}, 'yaxis': 'y2'})
         print("✅ Total P&L chart trace added")
     
-    # Update layout
-    fig.update_layout(
-        title="Portfolio Value and P&L Over Time",
-        xaxis_title="Date",
-        yaxis=dict(
-            title="Portfolio Value (¥)",
-            side="left",
-            showgrid=True
-        ),
-        yaxis2=dict(
-            title="P&L (¥)",
-            side="right",
-            overlaying="y",
-            showgrid=False
-        ),
-        height=500
-    )
+    fig = fast_figure(traces, layout={
+        'title': {'text': 'Portfolio Value and P&L Over Time'},
+        'xaxis': {'title': {'text': 'Date'}},
+        'yaxis': {'title': {'text': 'Portfolio Value (¥)'}, 'side': 'left', 'showgrid': True},
+        'yaxis2': {'title': {'text': 'P&L (¥)'}, 'side': 'right', 'overlaying': 'y', 'showgrid': False},
+        'height': 500
+    })
     
     print("✅ Chart layout configured successfully")
     print(f"✅ Chart has {len(fig.data)} traces")
     
     # Test P&L distribution chart
-    if result['trade_history']:
-        trades_df = pd.DataFrame(result['trade_history'])
-        sell_trades = trades_df[trades_df['action'] == 'SELL']
-        
+    if len(trades_df) > 0:
         if len(sell_trades) > 0 and 'pnl' in sell_trades.columns:
-            fig_pnl = go.Figure()
-            fig_pnl.add_trace(go.Histogram(
-                x=sell_trades['pnl'],
-                nbinsx=20,
-                name='Trade P&L',
-                marker_color='lightblue'
-            ))
-            fig_pnl.add_vline(x=0, line_dash="dash", line_color="red", 
-                             annotation_text="Break-even")
-            fig_pnl.update_layout(
-                title="Distribution of Trade P&L",
-                xaxis_title="P&L (¥)",
-                yaxis_title="Number of Trades",
-                height=300
+            # Break-even line spans the full plot height, like add_vline
+            fig_pnl = fast_figure(
+                [{'type': 'histogram', 'x': sell_trades['pnl'], 'nbinsx': 20,
+                  'name': 'Trade P&L', 'marker': {'color': 'lightblue'}}],
+                shapes=[{'type': 'line', 'x0': 0, 'x1': 0, 'xref': 'x', 'y0': 0, 'y1': 1, 'yref': 'paper',
+                         'line': {'color': 'red', 'dash': 'dash'}}],
+                annotations=[{'x': 0, 'y': 1, 'xref': 'x', 'yref': 'paper', 'text': 'Break-even',
+                              'showarrow': False, 'xanchor': 'left', 'yanchor': 'top'}],
+                layout={
+                    'title': {'text': 'Distribution of Trade P&L'},
+                    'xaxis': {'title': {'text': 'P&L (¥)'}},
+                    'yaxis': {'title': {'text': 'Number of Trades'}},
+                    'height': 300
+                }
             )
             print("✅ P&L distribution chart created successfully")
         else:
@@ -185,4 +153,4 @@ def test_pnl_visualization():
     return result
 
 if __name__ == "__main__":
-    test_pnl_visualization() 
\ No newline at end of file
+    test_pnl_visualization(shared_history=None, pairs_backtest_result=None)
\ No newline at end of file
@@ -8,8 +8,17 @@ from trading_algorithms import TradingAlgorithms
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from helpers import COMPARISON_FORMATTERS, buffered_stdout
 
-def test_range_bound_strategy():
+# Column formatters for this test's comparison table (one formatter per column, not per cell)
+RANGE_BOUND_FORMATTERS = {
+    **COMPARISON_FORMATTERS,
+    'Realized P&L': '¥{:,.0f}'.format,
+    'Win Rate (%)': '{:.1f}'.format
+}
+
+@buffered_stdout
+def test_range_bound_strategy(shared_history):
     """Test the range-bound strategy with different parameters"""
     
     print("="*60)
@@ -79,7 +88,8 @@ def test_range_bound_strategy():
             trading_algorithm=range_bound_strategy,
             symbols=symbols,
             start_date=start_date,
-            end_date=end_date
+            end_date=end_date,
+            historical_data=shared_history
         )
         
         results[config['name']] = result
@@ -93,24 +103,27 @@ def test_range_bound_strategy():
         
         # Analyze trade patterns
         if result['trade_history']:
-            trades_df = pd.DataFrame(result['trade_history'])
-            buy_trades = trades_df[trades_df['action'] == 'BUY']
-            sell_trades = trades_df[trades_df['action'] == 'SELL']
+            # Typed arrays for the action/P&L filters instead of a per-config DataFrame
+            trades = result['trade_history']
+            actions = np.array([trade['action'] for trade in trades])
+            pnls = np.array([trade.get('pnl', 0.0) for trade in trades], dtype=np.float64)
+            sell_mask = actions == 'SELL'
             
-            print(f"Buy Trades: {len(buy_trades)}")
-            print(f"Sell Trades: {len(sell_trades)}")
+            print(f"Buy Trades: {int((actions == 'BUY').sum())}")
+            print(f"Sell Trades: {int(sell_mask.sum())}")
             
-            if len(sell_trades) > 0 and 'pnl' in sell_trades.columns:
-                profitable_trades = sell_trades[sell_trades['pnl'] > 0]
-                losing_trades = sell_trades[sell_trades['pnl'] < 0]
+            if sell_mask.any():
+                sell_pnl = pnls[sell_mask]
+                wins = sell_pnl[sell_pnl > 0]
+                losses = sell_pnl[sell_pnl < 0]
                 
-                print(f"Profitable Trades: {len(profitable_trades)}")
-                print(f"Losing Trades: {len(losing_trades)}")
+                print(f"Profitable Trades: {len(wins)}")
+                print(f"Losing Trades: {len(losses)}")
                 
-                if len(profitable_trades) > 0:
-                    print(f"Average Profit: ¥{profitable_trades['pnl'].mean():,.0f}")
-                if len(losing_trades) > 0:
-                    print(f"Average Loss: ¥{losing_trades['pnl'].mean():,.0f}")
+                if len(wins) > 0:
+                    print(f"Average Profit: ¥{wins.mean():,.0f}")
+                if len(losses) > 0:
+                    print(f"Average Loss: ¥{losses.mean():,.0f}")
     
     # Compare results
     print(f"\n" + "="*60)
@@ -130,7 +143,7 @@ def test_range_bound_strategy():
         })
     
     df_comparison = pd.DataFrame(comparison_data)
-    print(df_comparison.to_string(index=False))
+    print(df_comparison.to_string(index=False, formatters=RANGE_BOUND_FORMATTERS))
     
     print(f"\n💡 RANGE-BOUND STRATEGY INSIGHTS:")
     print("1. **No Stop-Losses**: Designed to hold through temporary dips")
@@ -149,4 +162,4 @@ def test_range_bound_strategy():
     return results
 
 if __name__ == "__main__":
-    test_range_bound_strategy() 
\ No newline at end of file
+    test_range_bound_strategy(shared_history=None) 
\ No newline at end of file
@@ -8,7 +8,7 @@ from trading_algorithms import STRATEGIES, TradingAlgorithms
 import pandas as pd
 from datetime import datetime
 
-def test_streamlit_integration():
+def test_streamlit_integration(shared_history):
     """Test how Streamlit app would call the range_bound strategy"""
     
     print("="*60)
@@ -57,6 +57,7 @@ def test_streamlit_integration():
         symbols=symbols,
         start_date=start_date,
         end_date=end_date,
+        historical_data=shared_history,
         **strategy_params
     )
     
@@ -83,7 +84,8 @@ def test_streamlit_integration():
         trading_algorithm=manual_range_bound_strategy,
         symbols=symbols,
         start_date=start_date,
-        end_date=end_date
+        end_date=end_date,
+        historical_data=shared_history
     )
     
     print(f"📈 RESULT 2:")
@@ -104,4 +106,4 @@ def test_streamlit_integration():
     return result1, result2
 
 if __name__ == "__main__":
-    test_streamlit_integration() 
\ No newline at end of file
+    test_streamlit_integration(shared_history=None) 
\ No newline at end of file
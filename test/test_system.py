@@ -3,34 +3,31 @@
 Comprehensive test script for the trading system
 """
 
+import importlib.util
+import os
 import sys
 import traceback
-from datetime import datetime, timedelta
+from datetime import date, timedelta
+from helpers import buffered_stdout
+
+# Full tracebacks are only printed when STOCKAGENT_VERBOSE=1
+_VERBOSE = os.getenv('STOCKAGENT_VERBOSE', '0') == '1'
+
+# Backtest window for the engine test - date objects go straight to the engine
+END_DATE = date.today()
+START_DATE = END_DATE - timedelta(days=30)
 
 def test_imports():
     """Test that all modules can be imported"""
     print("Testing imports...")
     
-    try:
-        import yfinance as yf
-        print("✅ yfinance imported successfully")
-    except ImportError as e:
-        print(f"❌ yfinance import failed: {e}")
-        return False
-    
-    try:
-        import pandas as pd
-        print("✅ pandas imported successfully")
-    except ImportError as e:
-        print(f"❌ pandas import failed: {e}")
-        return False
-    
-    try:
-        import numpy as np
-        print("✅ numpy imported successfully")
-    except ImportError as e:
-        print(f"❌ numpy import failed: {e}")
-        return False
+    # Only check that third-party packages are installed - find_spec doesn't execute
+    # them, and the project imports below load them anyway
+    for module_name in ('yfinance', 'pandas', 'numpy'):
+        if importlib.util.find_spec(module_name) is None:
+            print(f"❌ {module_name} import failed: No module named '{module_name}'")
+            return False
+        print(f"✅ {module_name} is installed")
     
     try:
         from backtesting import BacktestingEngine
@@ -62,19 +59,25 @@ def test_data_fetching():
     try:
         import yfinance as yf
         
-        # Test fetching data for our ETFs
+        # Test fetching data for our ETFs - one batched request for all symbols
         symbols = ['1579.T', '1360.T']
-        
-        for symbol in symbols:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period='5d')
-            
-            if not hist.empty:
-                print(f"✅ Successfully fetched data for {symbol}")
-                print(f"   Latest price: ¥{hist['Close'].iloc[-1]:.2f}")
-            else:
-                print(f"❌ No data available for {symbol}")
-                return False
+        df = yf.download(symbols, period='5d', group_by='ticker', threads=True, progress=False)
+        if df.empty:
+            print(f"❌ No data available for {', '.join(symbols)}")
+            return False
+        
+        # Latest close for every symbol in one columnar slice; carry forward so a
+        # symbol missing only the last row still reports its latest price
+        closes = df.xs('Close', level=1, axis=1).ffill().iloc[-1].reindex(symbols)
+        bad_syms = closes.index[closes.isna()].tolist()
+        
+        for symbol, price in closes.dropna().items():
+            print(f"✅ Successfully fetched data for {symbol}")
+            print(f"   Latest price: ¥{price:.2f}")
+        for symbol in bad_syms:
+            print(f"❌ No data available for {symbol}")
+        if bad_syms:
+            return False
         
         return True
         
@@ -93,16 +96,12 @@ def test_backtesting():
         # Initialize engine
         engine = BacktestingEngine(initial_capital=1000000)
         
-        # Test with a short period
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
-        
-        # Test mean reversion strategy
+        # Test mean reversion strategy over a short period
         result = engine.run_backtest(
             trading_algorithm=STRATEGIES['mean_reversion'],
             symbols=['1579.T', '1360.T'],
-            start_date=start_date.strftime('%Y-%m-%d'),
-            end_date=end_date.strftime('%Y-%m-%d')
+            start_date=START_DATE,
+            end_date=END_DATE
         )
         
         print(f"✅ Backtesting completed successfully")
@@ -115,7 +114,8 @@ def test_backtesting():
         
     except Exception as e:
         print(f"❌ Backtesting failed: {e}")
-        traceback.print_exc()
+        if _VERBOSE:
+            traceback.print_exc()
         return False
 
 def test_trading_algorithms():
@@ -127,24 +127,15 @@ def test_trading_algorithms():
         import pandas as pd
         import numpy as np
         
-        # Create sample data
+        # Create sample data - one RNG draw and cumsum covers all four price columns
         dates = pd.date_range(start='2023-01-01', end='2023-12-31', freq='D')
-        sample_data = {
-            '1579.T': pd.DataFrame({
-                'Open': np.random.randn(len(dates)).cumsum() + 100,
-                'High': np.random.randn(len(dates)).cumsum() + 102,
-                'Low': np.random.randn(len(dates)).cumsum() + 98,
-                'Close': np.random.randn(len(dates)).cumsum() + 100,
-                'Volume': np.random.randint(1000, 10000, len(dates))
-            }, index=dates),
-            '1360.T': pd.DataFrame({
-                'Open': np.random.randn(len(dates)).cumsum() + 200,
-                'High': np.random.randn(len(dates)).cumsum() + 202,
-                'Low': np.random.randn(len(dates)).cumsum() + 198,
-                'Close': np.random.randn(len(dates)).cumsum() + 200,
-                'Volume': np.random.randint(1000, 10000, len(dates))
-            }, index=dates)
-        }
+        rng = np.random.default_rng(0)
+        sample_data = {}
+        for symbol, base in [('1579.T', 100), ('1360.T', 200)]:
+            prices = rng.standard_normal((len(dates), 4)).cumsum(axis=0) + np.array([base, base + 2, base - 2, base])
+            df = pd.DataFrame(prices, columns=['Open', 'High', 'Low', 'Close'], index=dates)
+            df['Volume'] = rng.integers(1000, 10000, len(dates))
+            sample_data[symbol] = df
         
         # Calculate technical indicators for sample data
         from backtesting import BacktestingEngine
@@ -161,7 +152,8 @@ def test_trading_algorithms():
                 print(f"✅ {strategy_name}: Generated {len(signals)} signals")
             except Exception as e:
                 print(f"❌ {strategy_name}: Failed - {e}")
-                traceback.print_exc()
+                if _VERBOSE:
+                    traceback.print_exc()
                 return False
         
         return True
@@ -198,6 +190,7 @@ def test_live_trading_setup():
         print(f"❌ Live trading setup failed: {e}")
         return False
 
+@buffered_stdout
 def main():
     """Run all tests"""
     print("🧪 Running comprehensive system tests...")
@@ -224,7 +217,8 @@ def main():
                 print(f"❌ {test_name} FAILED")
         except Exception as e:
             print(f"❌ {test_name} FAILED with exception: {e}")
-            traceback.print_exc()
+            if _VERBOSE:
+                traceback.print_exc()
     
     print("\n" + "=" * 50)
     print(f"📊 Test Results: {passed}/{total} tests passed")
@@ -1,13 +1,110 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Callable
+from typing import Dict, List, Callable, Tuple
 from datetime import datetime
+from itertools import chain
+
+# Readable text for the reason codes strategies attach to signals instead of a
+# preformatted 'reason' string; formatted only when a signal is displayed
+REASON_TEMPLATES = {
+    'RSI_OVERSOLD': 'RSI oversold ({:.1f})',
+    'RSI_OVERBOUGHT': 'RSI overbought ({:.1f})',
+    'BB_BELOW_LOWER': 'Price below BB lower ({:.0f} < {:.0f})',
+    'BB_ABOVE_UPPER': 'Price above BB upper ({:.0f} > {:.0f})',
+}
+
+# Keyword arguments each sub-strategy of combined_strategy accepts, so the
+# combined **params can be split instead of forwarded to every strategy
+_STRATEGY_PARAMS = {
+    'mean_reversion': {'rsi_oversold', 'rsi_overbought', 'bb_std_multiplier'},
+    'momentum': {'macd_threshold', 'volume_threshold'},
+    'pairs_trading': {'correlation_threshold', 'z_score_threshold'},
+    'trend_following': {'short_window', 'long_window'},
+    'volatility_breakout': {'atr_period', 'breakout_multiplier'},
+}
+
+def describe_signal(signal: Dict, default: str = 'Algorithm signal') -> str:
+    """Human-readable reason for a signal, from its 'reason' or 'reason_code'"""
+    if 'reason' in signal:
+        return signal['reason']
+    if 'reason_code' in signal:
+        code, *values = signal['reason_code']
+        return REASON_TEMPLATES[code].format(*values)
+    return default
+
+# Column name -> position maps, shared by every frame with the same columns
+_COLMAPS: Dict[Tuple[str, ...], Dict[str, int]] = {}
+
+def _colmap(df: pd.DataFrame) -> Dict[str, int]:
+    """Positions of df's columns, for reading values straight from its ndarray"""
+    columns = tuple(df.columns.tolist())
+    colmap = _COLMAPS.get(columns)
+    if colmap is None:
+        colmap = _COLMAPS[columns] = {name: i for i, name in enumerate(columns)}
+    return colmap
+
+def _last_values(df: pd.DataFrame, *columns: str) -> np.ndarray:
+    """
+    Last-row values of the given columns, read from the frame's ndarray
+    (a view for the all-float indicator frames) instead of a row Series
+    """
+    colmap = _colmap(df)
+    return df.to_numpy()[-1, [colmap[column] for column in columns]]
+
+def _atr_last(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> float:
+    """
+    Latest Average True Range, computed from the last `period` bars only
+    instead of building the full true-range and rolling-mean series
+    """
+    return _true_range(high[-period:], low[-period:], close[-period - 1:-1]).mean()
+
+def _true_range(high: np.ndarray, low: np.ndarray, prev_close: np.ndarray) -> np.ndarray:
+    """
+    True range for aligned high/low/previous-close arrays, reusing one scratch
+    buffer instead of allocating a temporary per term
+    """
+    true_range = high - low
+    scratch = np.subtract(high, prev_close)
+    np.abs(scratch, out=scratch)
+    np.maximum(true_range, scratch, out=true_range)
+    np.subtract(low, prev_close, out=scratch)
+    np.abs(scratch, out=scratch)
+    np.maximum(true_range, scratch, out=true_range)
+    return true_range
+
+def _correlation(a: np.ndarray, b: np.ndarray) -> float:
+    """Pearson correlation of two equal-length arrays (NaN if either is constant)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.corrcoef(a, b)[0, 1]
+
+def _sma_last_two(close: np.ndarray, window: int) -> Tuple[float, float]:
+    """
+    Latest and previous `window`-bar simple moving averages, computed from the
+    last window+1 closes (the previous one is NaN when there aren't enough bars)
+    """
+    tail = close[-window - 1:]
+    if len(tail) <= window:
+        return tail.mean(), np.nan
+    return tail[1:].mean(), tail[:-1].mean()
 
 class TradingAlgorithms:
     """
     Collection of trading algorithms for Nikkei 225 ETFs
     """
     
+    @staticmethod
+    def prepare(data: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        Back each symbol's indicator frame with one C-contiguous float64 matrix
+        (bars x columns), so every row slice the strategies read is a view of
+        contiguous memory rather than values spread across pandas blocks
+        """
+        prepared = {}
+        for symbol, df in data.items():
+            values = np.ascontiguousarray(df.to_numpy(dtype=np.float64))
+            prepared[symbol] = pd.DataFrame(values, index=df.index, columns=df.columns, copy=False)
+        return prepared
+    
     @staticmethod
     def mean_reversion_strategy(data: Dict[str, pd.DataFrame], 
                               current_prices: Dict[str, float],
@@ -19,50 +116,61 @@ class TradingAlgorithms:
         """
         signals = []
         
-        for symbol, df in data.items():
-            if len(df) < 50:  # Need enough data for indicators
-                continue
-                
-            current_row = df.iloc[-1]
+        # Last-row indicators for every symbol with enough data, stacked into arrays
+        symbols = [symbol for symbol, df in data.items() if len(df) >= 50]  # Need enough data for indicators
+        if not symbols:
+            return signals
+        
+        rsi, bb_lower, bb_upper = np.array([
+            _last_values(data[s], 'RSI', 'BB_Lower', 'BB_Upper') for s in symbols
+        ]).T
+        price = np.fromiter((current_prices[s] for s in symbols), dtype=np.float64, count=len(symbols))
+        
+        buy_rsi = rsi < rsi_oversold
+        sell_rsi = rsi > rsi_overbought
+        buy_bb = price < bb_lower
+        sell_bb = price > bb_upper
+        
+        # Only build signals for the symbols that triggered something
+        for i in np.flatnonzero(buy_rsi | sell_rsi | buy_bb | sell_bb):
+            symbol = symbols[i]
+            current_price = current_prices[symbol]
+            quantity = int(100000 / current_price)  # Trade ¥100k worth
             
             # RSI signals
-            if current_row['RSI'] < rsi_oversold:
+            if buy_rsi[i]:
                 # Oversold - buy signal
-                quantity = int(100000 / current_prices[symbol])  # Buy ¥100k worth
                 signals.append({
                     'symbol': symbol,
                     'action': 'BUY',
                     'quantity': quantity,
-                    'reason': f'RSI oversold ({current_row["RSI"]:.1f})'
+                    'reason_code': ('RSI_OVERSOLD', rsi[i])
                 })
-            elif current_row['RSI'] > rsi_overbought:
+            elif sell_rsi[i]:
                 # Overbought - sell signal
-                quantity = int(100000 / current_prices[symbol])  # Sell ¥100k worth
                 signals.append({
                     'symbol': symbol,
                     'action': 'SELL',
                     'quantity': quantity,
-                    'reason': f'RSI overbought ({current_row["RSI"]:.1f})'
+                    'reason_code': ('RSI_OVERBOUGHT', rsi[i])
                 })
             
             # Bollinger Bands signals
-            if current_prices[symbol] < current_row['BB_Lower']:
+            if buy_bb[i]:
                 # Price below lower band - buy signal
-                quantity = int(100000 / current_prices[symbol])
                 signals.append({
                     'symbol': symbol,
                     'action': 'BUY',
                     'quantity': quantity,
-                    'reason': f'Price below BB lower ({current_prices[symbol]:.0f} < {current_row["BB_Lower"]:.0f})'
+                    'reason_code': ('BB_BELOW_LOWER', current_price, bb_lower[i])
                 })
-            elif current_prices[symbol] > current_row['BB_Upper']:
+            elif sell_bb[i]:
                 # Price above upper band - sell signal
-                quantity = int(100000 / current_prices[symbol])
                 signals.append({
                     'symbol': symbol,
                     'action': 'SELL',
                     'quantity': quantity,
-                    'reason': f'Price above BB upper ({current_prices[symbol]:.0f} > {current_row["BB_Upper"]:.0f})'
+                    'reason_code': ('BB_ABOVE_UPPER', current_price, bb_upper[i])
                 })
         
         return signals
@@ -77,51 +185,61 @@ class TradingAlgorithms:
         """
         signals = []
         
-        for symbol, df in data.items():
-            if len(df) < 50:
-                continue
-                
-            current_row = df.iloc[-1]
+        # Last-row indicators for every symbol with enough data, stacked into arrays
+        symbols = [symbol for symbol, df in data.items() if len(df) >= 50]
+        if not symbols:
+            return signals
+        
+        macd, macd_signal, volume_ratio, close, sma_20 = np.array([
+            _last_values(data[s], 'MACD', 'MACD_Signal', 'Volume_Ratio', 'Close', 'SMA_20') for s in symbols
+        ]).T
+        
+        macd_buy = (macd > macd_signal) & (macd > macd_threshold)
+        macd_sell = (macd < macd_signal) & (macd < -macd_threshold)
+        high_volume = volume_ratio > volume_threshold
+        volume_buy = high_volume & (close > sma_20)
+        volume_sell = high_volume & (close < sma_20)
+        
+        # Only build signals for the symbols that triggered something
+        for i in np.flatnonzero(macd_buy | macd_sell | volume_buy | volume_sell):
+            symbol = symbols[i]
+            current_price = current_prices[symbol]
+            macd_quantity = int(150000 / current_price)
+            volume_quantity = int(100000 / current_price)
             
             # MACD signals
-            if current_row['MACD'] > current_row['MACD_Signal'] and current_row['MACD'] > macd_threshold:
+            if macd_buy[i]:
                 # MACD bullish crossover
-                quantity = int(150000 / current_prices[symbol])
                 signals.append({
                     'symbol': symbol,
                     'action': 'BUY',
-                    'quantity': quantity,
-                    'reason': f'MACD bullish ({current_row["MACD"]:.3f} > {current_row["MACD_Signal"]:.3f})'
+                    'quantity': macd_quantity,
+                    'reason': f'MACD bullish ({macd[i]:.3f} > {macd_signal[i]:.3f})'
                 })
-            elif current_row['MACD'] < current_row['MACD_Signal'] and current_row['MACD'] < -macd_threshold:
+            elif macd_sell[i]:
                 # MACD bearish crossover
-                quantity = int(150000 / current_prices[symbol])
                 signals.append({
                     'symbol': symbol,
                     'action': 'SELL',
-                    'quantity': quantity,
-                    'reason': f'MACD bearish ({current_row["MACD"]:.3f} < {current_row["MACD_Signal"]:.3f})'
+                    'quantity': macd_quantity,
+                    'reason': f'MACD bearish ({macd[i]:.3f} < {macd_signal[i]:.3f})'
                 })
             
-            # Volume confirmation
-            if current_row['Volume_Ratio'] > volume_threshold:
-                # High volume - potential trend continuation
-                if current_row['Close'] > current_row['SMA_20']:
-                    quantity = int(100000 / current_prices[symbol])
-                    signals.append({
-                        'symbol': symbol,
-                        'action': 'BUY',
-                        'quantity': quantity,
-                        'reason': f'High volume uptrend (Volume ratio: {current_row["Volume_Ratio"]:.1f})'
-                    })
-                elif current_row['Close'] < current_row['SMA_20']:
-                    quantity = int(100000 / current_prices[symbol])
-                    signals.append({
-                        'symbol': symbol,
-                        'action': 'SELL',
-                        'quantity': quantity,
-                        'reason': f'High volume downtrend (Volume ratio: {current_row["Volume_Ratio"]:.1f})'
-                    })
+            # Volume confirmation - high volume suggests trend continuation
+            if volume_buy[i]:
+                signals.append({
+                    'symbol': symbol,
+                    'action': 'BUY',
+                    'quantity': volume_quantity,
+                    'reason': f'High volume uptrend (Volume ratio: {volume_ratio[i]:.1f})'
+                })
+            elif volume_sell[i]:
+                signals.append({
+                    'symbol': symbol,
+                    'action': 'SELL',
+                    'quantity': volume_quantity,
+                    'reason': f'High volume downtrend (Volume ratio: {volume_ratio[i]:.1f})'
+                })
         
         return signals
     
@@ -145,24 +263,33 @@ class TradingAlgorithms:
         if len(df_1579) < 50 or len(df_1360) < 50:
             return signals
         
-        # Calculate rolling correlation
+        # Only the latest rolling window is needed, so slice it out as arrays
         window = 20
-        if len(df_1579) >= window:
-            correlation = df_1579['Close'].rolling(window).corr(df_1360['Close'])
-            current_corr = correlation.iloc[-1]
+        close_1579 = df_1579['Close']
+        close_1360 = df_1360['Close']
+        if not close_1579.index[-window:].equals(close_1360.index[-window:]):
+            # Pair up the closes by date when the two histories don't line up
+            close_1579, close_1360 = close_1579.align(close_1360, join='inner')
+        recent_1579 = close_1579.to_numpy()[-window:]
+        recent_1360 = close_1360.to_numpy()[-window:]
+        
+        if len(recent_1579) >= window:
+            # Calculate z-score of price ratio
+            price_ratio = recent_1579 / recent_1360
+            with np.errstate(divide='ignore', invalid='ignore'):
+                z_score = (price_ratio[-1] - price_ratio.mean()) / price_ratio.std(ddof=1)
             
-            if abs(current_corr) > correlation_threshold:
-                # Calculate z-score of price ratio
-                price_ratio = df_1579['Close'] / df_1360['Close']
-                ratio_mean = price_ratio.rolling(window).mean()
-                ratio_std = price_ratio.rolling(window).std()
-                z_score = (price_ratio.iloc[-1] - ratio_mean.iloc[-1]) / ratio_std.iloc[-1]
+            # Both conditions must hold; the z-score is cheaper and rarely past its
+            # threshold, so checking it first skips the correlation on quiet ticks
+            if abs(z_score) > z_score_threshold and abs(_correlation(recent_1579, recent_1360)) > correlation_threshold:
+                # Both legs trade ¥100k worth
+                price_1579 = current_prices['1579.T']
+                price_1360 = current_prices['1360.T']
+                quantity_1579 = int(100000 / price_1579)
+                quantity_1360 = int(100000 / price_1360)
                 
                 if z_score > z_score_threshold:
                     # 1579.T is overvalued relative to 1360.T
-                    quantity_1579 = int(100000 / current_prices['1579.T'])
-                    quantity_1360 = int(100000 / current_prices['1360.T'])
-                    
                     signals.extend([
                         {
                             'symbol': '1579.T',
@@ -179,9 +306,6 @@ class TradingAlgorithms:
                     ])
                 elif z_score < -z_score_threshold:
                     # 1360.T is overvalued relative to 1579.T
-                    quantity_1579 = int(100000 / current_prices['1579.T'])
-                    quantity_1360 = int(100000 / current_prices['1360.T'])
-                    
                     signals.extend([
                         {
                             'symbol': '1579.T',
@@ -213,35 +337,32 @@ class TradingAlgorithms:
             if len(df) < long_window:
                 continue
                 
-            # Calculate additional moving averages
-            df['SMA_Short'] = df['Close'].rolling(window=short_window).mean()
-            df['SMA_Long'] = df['Close'].rolling(window=long_window).mean()
+            # Only the latest two values of each moving average are needed; the previous
+            # ones are NaN until there are enough bars, so no cross can fire early
+            close = df['Close'].to_numpy()
+            short_now, short_prev = _sma_last_two(close, short_window)
+            long_now, long_prev = _sma_last_two(close, long_window)
+            current_price = current_prices[symbol]
             
-            current_row = df.iloc[-1]
-            prev_row = df.iloc[-2] if len(df) > 1 else None
+            # Golden cross (short MA crosses above long MA)
+            if short_now > long_now and short_prev <= long_prev:
+                quantity = int(200000 / current_price)
+                signals.append({
+                    'symbol': symbol,
+                    'action': 'BUY',
+                    'quantity': quantity,
+                    'reason': f'Golden cross ({short_window}MA > {long_window}MA)'
+                })
             
-            if prev_row is not None:
-                # Golden cross (short MA crosses above long MA)
-                if (current_row['SMA_Short'] > current_row['SMA_Long'] and 
-                    prev_row['SMA_Short'] <= prev_row['SMA_Long']):
-                    quantity = int(200000 / current_prices[symbol])
-                    signals.append({
-                        'symbol': symbol,
-                        'action': 'BUY',
-                        'quantity': quantity,
-                        'reason': f'Golden cross ({short_window}MA > {long_window}MA)'
-                    })
-                
-                # Death cross (short MA crosses below long MA)
-                elif (current_row['SMA_Short'] < current_row['SMA_Long'] and 
-                      prev_row['SMA_Short'] >= prev_row['SMA_Long']):
-                    quantity = int(200000 / current_prices[symbol])
-                    signals.append({
-                        'symbol': symbol,
-                        'action': 'SELL',
-                        'quantity': quantity,
-                        'reason': f'Death cross ({short_window}MA < {long_window}MA)'
-                    })
+            # Death cross (short MA crosses below long MA)
+            elif short_now < long_now and short_prev >= long_prev:
+                quantity = int(200000 / current_price)
+                signals.append({
+                    'symbol': symbol,
+                    'action': 'SELL',
+                    'quantity': quantity,
+                    'reason': f'Death cross ({short_window}MA < {long_window}MA)'
+                })
         
         return signals
     
@@ -255,42 +376,43 @@ class TradingAlgorithms:
         """
         signals = []
         
-        for symbol, df in data.items():
-            if len(df) < atr_period + 1:
-                continue
-                
-            # Calculate ATR
-            high_low = df['High'] - df['Low']
-            high_close = np.abs(df['High'] - df['Close'].shift())
-            low_close = np.abs(df['Low'] - df['Close'].shift())
-            
-            true_range = np.maximum(high_low, np.maximum(high_close, low_close))
-            atr = true_range.rolling(window=atr_period).mean()
-            
-            current_row = df.iloc[-1]
-            current_atr = atr.iloc[-1]
-            
-            # Breakout signals
-            upper_band = current_row['SMA_20'] + (breakout_multiplier * current_atr)
-            lower_band = current_row['SMA_20'] - (breakout_multiplier * current_atr)
-            
-            if current_prices[symbol] > upper_band:
-                # Upside breakout
-                quantity = int(150000 / current_prices[symbol])
+        # Latest SMA and ATR for every symbol with enough data, stacked into arrays
+        symbols = [symbol for symbol, df in data.items() if len(df) >= atr_period + 1]
+        if not symbols:
+            return signals
+        
+        n = len(symbols)
+        sma_20 = np.fromiter((_last_values(data[s], 'SMA_20')[0] for s in symbols), dtype=np.float64, count=n)
+        current_atr = np.fromiter(
+            (_atr_last(data[s]['High'].to_numpy(), data[s]['Low'].to_numpy(), data[s]['Close'].to_numpy(), atr_period)
+             for s in symbols),
+            dtype=np.float64, count=n
+        )
+        price = np.fromiter((current_prices[s] for s in symbols), dtype=np.float64, count=n)
+        
+        # Breakout bands and signals for all symbols at once, without per-symbol branches
+        upper_band = sma_20 + (breakout_multiplier * current_atr)
+        lower_band = sma_20 - (breakout_multiplier * current_atr)
+        upside = price > upper_band
+        downside = price < lower_band
+        
+        for i in np.flatnonzero(upside | downside):
+            symbol = symbols[i]
+            current_price = current_prices[symbol]
+            quantity = int(150000 / current_price)
+            if upside[i]:
                 signals.append({
                     'symbol': symbol,
                     'action': 'BUY',
                     'quantity': quantity,
-                    'reason': f'Upside breakout (Price: {current_prices[symbol]:.0f} > {upper_band:.0f})'
+                    'reason': f'Upside breakout (Price: {current_price:.0f} > {upper_band[i]:.0f})'
                 })
-            elif current_prices[symbol] < lower_band:
-                # Downside breakout
-                quantity = int(150000 / current_prices[symbol])
+            else:
                 signals.append({
                     'symbol': symbol,
                     'action': 'SELL',
                     'quantity': quantity,
-                    'reason': f'Downside breakout (Price: {current_prices[symbol]:.0f} < {lower_band:.0f})'
+                    'reason': f'Downside breakout (Price: {current_price:.0f} < {lower_band[i]:.0f})'
                 })
         
         return signals
@@ -334,7 +456,7 @@ class TradingAlgorithms:
                 # Range-bound trading logic
                 if current_price <= low_percentile:
                     # Buy at range lows - no stop loss
-                    quantity = int(200000 / current_prices[symbol])  # Larger position for range trading
+                    quantity = int(200000 / current_price)  # Larger position for range trading
                     signals.append({
                         'symbol': symbol,
                         'action': 'BUY',
@@ -343,7 +465,7 @@ class TradingAlgorithms:
                     })
                 elif current_price >= high_percentile:
                     # Sell at range highs
-                    quantity = int(200000 / current_prices[symbol])
+                    quantity = int(200000 / current_price)
                     signals.append({
                         'symbol': symbol,
                         'action': 'SELL',
@@ -352,24 +474,24 @@ class TradingAlgorithms:
                     })
             else:
                 # Trending market - use momentum signals
-                current_row = df.iloc[-1]
+                rsi = _last_values(df, 'RSI')[0]
                 
                 # RSI for trend confirmation
-                if current_row['RSI'] < 30:
-                    quantity = int(150000 / current_prices[symbol])
+                if rsi < 30:
+                    quantity = int(150000 / current_price)
                     signals.append({
                         'symbol': symbol,
                         'action': 'BUY',
                         'quantity': quantity,
-                        'reason': f'Trending market oversold RSI ({current_row["RSI"]:.1f})'
+                        'reason': f'Trending market oversold RSI ({rsi:.1f})'
                     })
-                elif current_row['RSI'] > 70:
-                    quantity = int(150000 / current_prices[symbol])
+                elif rsi > 70:
+                    quantity = int(150000 / current_price)
                     signals.append({
                         'symbol': symbol,
                         'action': 'SELL',
                         'quantity': quantity,
-                        'reason': f'Trending market overbought RSI ({current_row["RSI"]:.1f})'
+                        'reason': f'Trending market overbought RSI ({rsi:.1f})'
                     })
         
         return signals
@@ -385,30 +507,36 @@ class TradingAlgorithms:
         """
         signals = []
         
-        # Get signals from different strategies
-        mean_rev_signals = TradingAlgorithms.mean_reversion_strategy(data, current_prices, **params)
-        momentum_signals = TradingAlgorithms.momentum_strategy(data, current_prices, **params)
-        pairs_signals = TradingAlgorithms.pairs_trading_strategy(data, current_prices, **params)
-        trend_signals = TradingAlgorithms.trend_following_strategy(data, current_prices, **params)
-        volatility_signals = TradingAlgorithms.volatility_breakout_strategy(data, current_prices, **params)
+        # Each sub-strategy only gets the params it accepts; reject ones none of them do
+        unknown = set(params).difference(*_STRATEGY_PARAMS.values())
+        if unknown:
+            raise TypeError(f"combined_strategy got unexpected keyword arguments: {', '.join(sorted(unknown))}")
+        split = {name: {k: v for k, v in params.items() if k in accepted}
+                 for name, accepted in _STRATEGY_PARAMS.items()}
         
-        # Combine all signals
-        all_signals = mean_rev_signals + momentum_signals + pairs_signals + trend_signals + volatility_signals
+        # Get signals from different strategies
+        mean_rev_signals = TradingAlgorithms.mean_reversion_strategy(data, current_prices, **split['mean_reversion'])
+        momentum_signals = TradingAlgorithms.momentum_strategy(data, current_prices, **split['momentum'])
+        pairs_signals = TradingAlgorithms.pairs_trading_strategy(data, current_prices, **split['pairs_trading'])
+        trend_signals = TradingAlgorithms.trend_following_strategy(data, current_prices, **split['trend_following'])
+        volatility_signals = TradingAlgorithms.volatility_breakout_strategy(data, current_prices, **split['volatility_breakout'])
         
-        # Group by symbol and action
-        signal_groups = {}
-        for signal in all_signals:
+        # Tally the votes and total quantity per (symbol, action) in one pass
+        votes = {}
+        for signal in chain(mean_rev_signals, momentum_signals, pairs_signals, trend_signals, volatility_signals):
             key = (signal['symbol'], signal['action'])
-            if key not in signal_groups:
-                signal_groups[key] = []
-            signal_groups[key].append(signal)
+            tally = votes.get(key)
+            if tally is None:
+                votes[key] = [1, signal['quantity']]
+            else:
+                tally[0] += 1
+                tally[1] += signal['quantity']
         
         # Vote-based signal aggregation with risk management
-        for (symbol, action), signal_list in signal_groups.items():
-            if len(signal_list) >= 2:  # Require at least 2 strategies to agree
+        for (symbol, action), (count, total_quantity) in votes.items():
+            if count >= 2:  # Require at least 2 strategies to agree
                 # Calculate weighted average quantity (not max)
-                total_quantity = sum(signal['quantity'] for signal in signal_list)
-                avg_quantity = int(total_quantity / len(signal_list))
+                avg_quantity = int(total_quantity / count)
                 
                 # Apply position size limits
                 max_quantity = int(1000000 * max_position_size / current_prices[symbol])
@@ -420,7 +548,7 @@ class TradingAlgorithms:
                         'symbol': symbol,
                         'action': action,
                         'quantity': final_quantity,
-                        'reason': f'Combined strategy: {len(signal_list)} strategies agree'
+                        'reason': f'Combined strategy: {count} strategies agree'
                     })
         
         return signals